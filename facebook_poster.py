@@ -11,6 +11,7 @@ from datetime import datetime, timezone, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
 
 # ----------------------------
@@ -28,6 +29,13 @@ DEFAULT_FB_TIMEOUT_SECONDS = int(os.getenv("FB_TIMEOUT_SECONDS", "30"))
 # Small per-request jitter (helps avoid "same-second" spam heuristics)
 DEFAULT_FB_JITTER_SECONDS = float(os.getenv("FB_JITTER_SECONDS", "3"))      # seconds
 
+# One keep-alive session for graph.facebook.com (carousel = several POSTs per post)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=8))
+
+# Public URLs are handed to Graph as-is; anything else is uploaded as bytes
+_HTTP_URL_RE = re.compile(r"^https?://", re.IGNORECASE)
+
 
 # ----------------------------
 # State helpers
@@ -167,7 +175,7 @@ def _post(url: str, *, data: Dict[str, Any], files: Optional[Dict[str, Any]] = N
     jitter = max(0.0, float(DEFAULT_FB_JITTER_SECONDS))
     if jitter:
         time.sleep(random.uniform(0.0, jitter))
-    return requests.post(url, data=data, files=files, timeout=DEFAULT_FB_TIMEOUT_SECONDS)
+    return _SESSION.post(url, data=data, files=files, timeout=DEFAULT_FB_TIMEOUT_SECONDS)
 
 
 def _raise_for_status(resp: requests.Response, label: str) -> None:
@@ -231,7 +239,7 @@ def post_carousel_to_facebook_page(caption: str, image_urls: List[str]) -> Dict[
     media_fbids: List[str] = []
 
     for u in image_urls[:10]:
-        if re.match(r"^https?://", u, flags=re.IGNORECASE):
+        if _HTTP_URL_RE.match(u):
             r = _post(photos_url, data={"url": u, "published": "false", "access_token": page_token})
         else:
             img_bytes, mime_type = load_image_bytes(u)
@@ -23,25 +23,39 @@
 #   - Severity emoji logic must NOT be changed. (It is preserved as-is.)
 
 import base64
+import collections
 import datetime as dt
 import email.utils
+import functools
 import hashlib
+import html
+import itertools
 import json
 import os
 import re
+import tempfile
+import threading
 import time
 import random  # ✅ REQUIRED for weighted selection
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
 
 import requests
-from bs4 import BeautifulSoup
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from PIL import Image
-from requests_oauthlib import OAuth1
+from requests.adapters import HTTPAdapter
+
+# google-api-python-client, Pillow and requests-oauthlib are imported inside the
+# functions that need them: most runs post nothing and never touch them.
+
+# lxml (libxml2) parses/serializes the RSS file much faster; the stdlib API is
+# compatible, so fall back to it when lxml isn't installed. Feed parsing stays
+# on ElementTree either way.
+try:
+    from lxml import etree as RSS_ET
+except ImportError:  # pragma: no cover
+    RSS_ET = ET
 
 import facebook_poster as fb
 from telegram_gate import (
@@ -98,6 +112,12 @@ def _norm_severity(v: object) -> str:
 # =============================================================================
 # Feature toggles (controlled by GitHub Actions env)
 # =============================================================================
+@functools.lru_cache(maxsize=None)
+def _env(name: str, default: str = "") -> str:
+    """Stripped env var, read once per process (credentials never change mid-run)."""
+    return (os.environ.get(name, default) or "").strip()
+
+
 ENABLE_X_POSTING = os.getenv("ENABLE_X_POSTING", "false").lower() == "true"
 ENABLE_FB_POSTING = os.getenv("ENABLE_FB_POSTING", "false").lower() == "true"
 TELEGRAM_ENABLE_GATE = os.getenv("TELEGRAM_ENABLE_GATE", "true").lower() == "true"
@@ -135,6 +155,11 @@ ROTATED_X_REFRESH_TOKEN_PATH = "x_refresh_token_rotated.txt"
 
 USER_AGENT = "tay-weather-rss-bot/1.1"
 
+# Shared keep-alive session for the feed, EC pages, 511 and image downloads.
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+_HTTP.headers["User-Agent"] = USER_AGENT
+
 # =============================================================================
 # URLs and feed settings
 # =============================================================================
@@ -164,6 +189,13 @@ COOLDOWN_MINUTES = {
 }
 GLOBAL_COOLDOWN_MINUTES = 5
 
+# =============================================================================
+# Telegram approval timing
+# =============================================================================
+TELEGRAM_WAIT_SECONDS = int(_env("TELEGRAM_WAIT_SECONDS", "600"))
+TELEGRAM_APPROVAL_TTL_MIN = int(_env("TELEGRAM_APPROVAL_TTL_MIN", "60"))
+TELEGRAM_PREVIEW_DELAY_MIN = int(_env("TELEGRAM_PREVIEW_DELAY_MIN", "15"))
+
 # =============================================================================
 # Telegram helper: final "test succeeded" confirmation
 # =============================================================================
@@ -189,10 +221,16 @@ def warning_delay_elapsed(state: Dict[str, Any], token: str) -> bool:
         unless denied.
 
     NOTE:
-      - pending_approvals[token]["created_at"] is ISO time (e.g. 2026-01-09T01:23:45Z)
+      - pending_approvals[token]["created_at_ts"] is epoch seconds; older records
+        only have "created_at", an ISO time (e.g. 2026-01-09T01:23:45Z)
     """
-    delay_min = int(os.getenv("TELEGRAM_PREVIEW_DELAY_MIN", "15"))
+    delay_min = TELEGRAM_PREVIEW_DELAY_MIN
     pending = (state.get("pending_approvals") or {}).get(token) or {}
+
+    created_ts = pending.get("created_at_ts")
+    if isinstance(created_ts, (int, float)):
+        return (time.time() - created_ts) >= (delay_min * 60)
+
     created_at = (pending.get("created_at") or "").strip()
 
     if not created_at:
@@ -222,12 +260,15 @@ def _no_post_guard(platform: str) -> bool:
 # =============================================================================
 # Helper: normalize text for stable comparisons
 # =============================================================================
+_WS_RE = re.compile(r"\s+")
+
+
 def normalize(s: str) -> str:
     if not s:
         return ""
     s = s.lower()
     s = s.replace("–", "-").replace("—", "-")
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _WS_RE.sub(" ", s).strip()
     return s
 
 
@@ -244,11 +285,13 @@ def text_hash(s: str) -> str:
 # ---------------------------------------------------------------------
 # ENDED / ALL-CLEAR detection (keeps core logic intact)
 # ---------------------------------------------------------------------
-_ENDED_PHRASES = (
-    " no longer in effect",
-    " is no longer in effect",
-    " has ended",
-    " ended",
+# " is no longer in effect" / " has ended" are covered by the shorter phrases.
+_ENDED_RE = re.compile(r" (?:no longer in effect|ended)", re.IGNORECASE)
+
+# EC "nothing in effect" bulletins: kept in the feed but never posted socially.
+_GENERAL_BULLETIN_RE = re.compile(
+    r"no\s+alerts\s+in\s+effect|no\s+watches\s+or\s+warnings\s+in\s+effect",
+    re.IGNORECASE,
 )
 
 def is_alert_ended(title: str, summary: str) -> bool:
@@ -256,8 +299,7 @@ def is_alert_ended(title: str, summary: str) -> bool:
     Returns True when Environment Canada issues an 'ended' / 'no longer in effect' entry.
     This does NOT change warning/watch/advisory wording. It's just a state detector.
     """
-    t = f"{title or ''} {summary or ''}".lower()
-    return any(p in t for p in _ENDED_PHRASES)
+    return bool(_ENDED_RE.search(f"{title or ''} {summary or ''}"))
 
 # =============================================================================
 # Severity emoji (match Environment Canada alert colours)
@@ -324,6 +366,9 @@ def load_state() -> dict:
         # Simple EC change tracking
         "last_ec_updated_iso": "",
         "last_had_alert": False,
+
+        # Conditional GET validators, keyed by URL: {url: {"etag", "last_modified"}}
+        "http_validators": {},
     }
 
 
@@ -345,18 +390,56 @@ def load_state() -> dict:
     return data
 
 
+# Oldest entries drop first once a history list reaches this length.
+MAX_POSTED_HISTORY = 5000
+
+_LAST_STATE_WRITE: Optional[Tuple[str, Tuple[int, int]]] = None
+
+
 def save_state(state: dict) -> None:
-    state["seen_ids"] = state.get("seen_ids", [])[-5000:]
-    state["posted_guids"] = state.get("posted_guids", [])[-5000:]
-    state["posted_text_hashes"] = state.get("posted_text_hashes", [])[-5000:]
+    global _LAST_STATE_WRITE
+
+    state["seen_ids"] = state.get("seen_ids", [])[-MAX_POSTED_HISTORY:]
+    state["posted_guids"] = state.get("posted_guids", [])[-MAX_POSTED_HISTORY:]
+    state["posted_text_hashes"] = state.get("posted_text_hashes", [])[-MAX_POSTED_HISTORY:]
 
     cds = state.get("cooldowns", {})
     if isinstance(cds, dict) and len(cds) > 5000:
         items = sorted(cds.items(), key=lambda kv: kv[1], reverse=True)[:4000]
         state["cooldowns"] = dict(items)
 
-    with open(STATE_PATH, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2)
+    text = json.dumps(state, indent=2)
+
+    # The Telegram helpers call this on every poll; skip rewriting identical
+    # content, unless the file changed on disk since (facebook_poster writes it too).
+    try:
+        st = os.stat(STATE_PATH)
+        on_disk = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        on_disk = None
+    if on_disk is not None and _LAST_STATE_WRITE == (text, on_disk):
+        return
+
+    # One write + fsync to a temp file, then an atomic rename: a crash mid-write
+    # can't leave a truncated state.json behind.
+    tmp_path = STATE_PATH + ".tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, text.encode("utf-8"))
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, STATE_PATH)
+
+    st = os.stat(STATE_PATH)
+    _LAST_STATE_WRITE = (text, (st.st_mtime_ns, st.st_size))
+
+
+def _remember(seen: set, order: Deque[str], key: str) -> None:
+    """Add key to a lookup set and its bounded, insertion-ordered history (what gets saved)."""
+    if key not in seen:
+        seen.add(key)
+        order.append(key)
 
 
 # =============================================================================
@@ -401,13 +484,13 @@ def _url_looks_ok(url: str) -> bool:
     if not url:
         return False
     try:
-        r = requests.head(url, allow_redirects=True, headers={"User-Agent": USER_AGENT}, timeout=(5, 15))
+        r = _HTTP.head(url, allow_redirects=True, timeout=(5, 15))
         if r.status_code < 400:
             return True
     except Exception:
         pass
     try:
-        r = requests.get(url, allow_redirects=True, headers={"User-Agent": USER_AGENT}, timeout=(5, 15))
+        r = _HTTP.get(url, allow_redirects=True, timeout=(5, 15))
         return r.status_code < 400
     except Exception:
         return False
@@ -425,31 +508,70 @@ def resolve_more_info_url() -> str:
 ATOM_NS = {"a": "http://www.w3.org/2005/Atom"}
 
 
+RFC2822_FORMAT = "%a, %d %b %Y %H:%M:%S %z"
+
+
+@functools.lru_cache(maxsize=2048)
 def _parse_atom_dt(s: str) -> dt.datetime:
     if not s:
         return dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
     return dt.datetime.fromisoformat(s.replace("Z", "+00:00"))
 
 
-def fetch_feed_entries(feed_url: str, retries: int = 3, timeout: Tuple[int, int] = (5, 20)) -> List[Dict[str, Any]]:
+@functools.lru_cache(maxsize=2048)
+def _parse_rss_dt(s: str) -> dt.datetime:
+    """
+    RSS pubDate parser.
+    Fast path: the common "Tue, 13 Jan 2026 14:05:00 +0000" shape via a single strptime.
+    Anything else (named zones like "GMT"/"EST", missing seconds, etc.) falls back
+    to the full email.utils parser.
+    """
+    s = (s or "").strip()
+    if not s:
+        return dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+    try:
+        return dt.datetime.strptime(s, RFC2822_FORMAT).astimezone(dt.timezone.utc)
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(s)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=dt.timezone.utc)
+        return parsed.astimezone(dt.timezone.utc)
+    except Exception:
+        return dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def fetch_feed_entries(
+    feed_url: str,
+    retries: int = 3,
+    timeout: Tuple[int, int] = (5, 20),
+    validators: Optional[Dict[str, str]] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """Fetch and parse the alert feed (Atom or RSS 2.0), newest first.
+
+    When `validators` ({"etag", "last_modified"}) is given, the request is
+    conditional: returns None on 304 Not Modified, and on 200 the dict is
+    updated in place with the response's validators.
+    """
     last_err: Optional[Exception] = None
 
-    def _parse_rss_dt(s: str) -> dt.datetime:
-        s = (s or "").strip()
-        if not s:
-            return dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
-        try:
-            parsed = email.utils.parsedate_to_datetime(s)
-            if parsed.tzinfo is None:
-                parsed = parsed.replace(tzinfo=dt.timezone.utc)
-            return parsed.astimezone(dt.timezone.utc)
-        except Exception:
-            return dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+    headers: Dict[str, str] = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
 
     for attempt in range(retries):
         try:
-            r = requests.get(feed_url, headers={"User-Agent": USER_AGENT}, timeout=timeout)
+            r = _HTTP.get(feed_url, headers=headers, timeout=timeout)
+            if r.status_code == 304 and headers:
+                return None
             r.raise_for_status()
+            if validators is not None:
+                validators["etag"] = r.headers.get("ETag", "")
+                validators["last_modified"] = r.headers.get("Last-Modified", "")
             root = ET.fromstring(r.content)
 
             entries: List[Dict[str, Any]] = []
@@ -529,12 +651,87 @@ def atom_title_for_tay(title: str) -> str:
 def normalize_alert_title(title: str) -> str:
     t = (title or "").strip()
     t = t.replace("–", "-").replace("—", "-")
-    t = re.sub(r"\s+", " ", t).strip()
+    t = _WS_RE.sub(" ", t).strip()
     return t
 
 # =============================================================================
 # Environment Canada detail extraction
 # =============================================================================
+# "What:" and "When:" in one pass; the match's lastgroup says which one hit
+_EC_WHAT_WHEN_RE = re.compile(
+    r"What:\s*(?P<what>.+?)(?=\s+(?:When:|Where:|Additional information:))"
+    r"|When:\s*(?P<when>.+?)(?=\s+(?:Where:|Additional information:)|$)",
+    re.IGNORECASE,
+)
+
+# Whole-page tag stripper: script/style bodies and comments go with their tags
+_PAGE_TAG_RE = re.compile(r"<(script|style)\b[^>]*>.*?</\1\s*>|<!--.*?-->|<[^>]+>", re.S | re.I)
+
+_ISSUED_PREFIX_RE = re.compile(r"^\s*issued\b", re.IGNORECASE)
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+_EC_RECOMMENDED_ACTION_RE = re.compile(
+    r"(Recommended action[s]?:)\s*(.+?)(?=\s+(What:|When:|Where:|Additional information:|$))",
+    re.IGNORECASE,
+)
+
+# How much visible text after "What:" the fast path looks at
+EC_DETAILS_FAST_WINDOW = 8000
+
+
+def _iter_sentences(text: str) -> Iterator[str]:
+    """Lazy _SENTENCE_SPLIT_RE.split(): callers that stop early don't split the whole page."""
+    start = 0
+    for m in _SENTENCE_SPLIT_RE.finditer(text):
+        yield text[start:m.start()]
+        start = m.end()
+    yield text[start:]
+
+
+def _clean_ec_details(s: str) -> str:
+    s = _WS_RE.sub(" ", (s or "")).strip()
+    if not s:
+        return ""
+    if _ISSUED_PREFIX_RE.match(s):
+        return ""
+    if "bookmarking your customized list" in s.lower():
+        return ""
+    if "continue to monitor" in s.lower():
+        return ""
+    if "share this page" in s.lower():
+        return ""
+    return s
+
+
+def _ec_what_when_lines(text: str) -> List[str]:
+    found: Dict[str, str] = {}
+    for m in _EC_WHAT_WHEN_RE.finditer(text):
+        found.setdefault(m.lastgroup, m.group(m.lastgroup))
+        if len(found) == 2:
+            break
+
+    out: List[str] = []
+    for key in ("what", "when"):
+        line = _clean_ec_details(found.get(key, ""))
+        if line:
+            out.append(line.rstrip(".") + ".")
+    return out
+
+
+@functools.lru_cache(maxsize=64)
+def _fetch_ec_page_html(official_url: str) -> str:
+    """EC alert page HTML, fetched once per URL per run (X and FB builders both read it)."""
+    r = _HTTP.get(official_url, timeout=(10, 30))
+    r.raise_for_status()
+    return r.text
+
+
+@functools.lru_cache(maxsize=64)
+def _ec_page_text(official_url: str) -> str:
+    """Visible page text as one space-joined line (regex tag strip, no DOM)."""
+    page_html = _fetch_ec_page_html(official_url)
+    return _WS_RE.sub(" ", html.unescape(_PAGE_TAG_RE.sub(" ", page_html))).strip()
+
+
 def _extract_details_lines_from_ec(official_url: str) -> List[str]:
     """
     Extracts short 'What' and 'When' lines from the official Environment Canada alert page.
@@ -544,58 +741,35 @@ def _extract_details_lines_from_ec(official_url: str) -> List[str]:
     if not official_url:
         return []
 
-    r = requests.get(official_url, headers={"User-Agent": USER_AGENT}, timeout=(10, 30))
-    r.raise_for_status()
-
-    soup = BeautifulSoup(r.text, "html.parser")
-    raw = soup.get_text("\n")
-    lines = [ln.strip() for ln in raw.splitlines()]
-    lines = [ln for ln in lines if ln]
-    text = " ".join(lines)
-
-    def _clean_details(s: str) -> str:
-        s = re.sub(r"\s+", " ", (s or "")).strip()
-        if not s:
-            return ""
-        if re.match(r"^\s*issued\b", s, flags=re.IGNORECASE):
-            return ""
-        if "bookmarking your customized list" in s.lower():
-            return ""
-        if "continue to monitor" in s.lower():
-            return ""
-        if "share this page" in s.lower():
-            return ""
-        return s
+    # Search the stripped text, not the raw HTML: a "What:" inside a <script>,
+    # an attribute or a comment must not start the window.
+    text = _ec_page_text(official_url)
 
-    m_what = re.search(r"What:\s*(.+?)(?=\s+(When:|Where:|Additional information:))", text, re.IGNORECASE)
-    m_when = re.search(r"When:\s*(.+?)(?=\s+(Where:|Additional information:)|$)", text, re.IGNORECASE)
-
-    out: List[str] = []
-    if m_what:
-        what = _clean_details(m_what.group(1))
-        if what:
-            out.append(what.rstrip(".") + ".")
-    if m_when:
-        when = _clean_details(m_when.group(1))
-        if when:
-            out.append(when.rstrip(".") + ".")
+    # Fast path: run the regexes over a window starting at the first visible "What:"
+    start = text.find("What:")
+    if start >= 0:
+        out = _ec_what_when_lines(text[start:start + EC_DETAILS_FAST_WINDOW])
+        if out:
+            return out
 
+    out = _ec_what_when_lines(text)
     if out:
-        return out[:2]
+        return out
 
     # Fallback: pick the first decent weather-related sentence
     weather_keywords = (
         "snow", "snowfall", "squall", "rain", "freezing", "ice", "wind", "fog",
         "visibility", "blowing", "drifting", "thunder", "heat", "cold",
     )
-    sentences = re.split(r"(?<=[.!?])\s+", text)
-    for s in sentences[:140]:
+    for s in itertools.islice(_iter_sentences(text), 140):
         s = s.strip()
-        if 25 <= len(s) <= 240 and any(k in s.lower() for k in weather_keywords):
-            sl = s.lower()
+        if not 25 <= len(s) <= 240:
+            continue
+        sl = s.lower()
+        if any(k in sl for k in weather_keywords):
             if "environment canada" in sl or "continue to monitor" in sl:
                 continue
-            candidate = _clean_details(s)
+            candidate = _clean_ec_details(s)
             if candidate:
                 return [candidate.rstrip(".") + "."]
     return []
@@ -610,17 +784,10 @@ def _extract_recommended_action_from_ec(official_url: str) -> str:
     if not official_url:
         return ""
 
-    r = requests.get(official_url, headers={"User-Agent": USER_AGENT}, timeout=(10, 30))
-    r.raise_for_status()
-
-    soup = BeautifulSoup(r.text, "html.parser")
-    raw = soup.get_text("\n")
-    lines = [ln.strip() for ln in raw.splitlines()]
-    lines = [ln for ln in lines if ln]
-    text = " ".join(lines)
+    text = _ec_page_text(official_url)
 
     def _clean_action(s: str) -> str:
-        s = re.sub(r"\s+", " ", (s or "")).strip()
+        s = _WS_RE.sub(" ", (s or "")).strip()
         if not s:
             return ""
         if "bookmarking your customized list" in s.lower():
@@ -630,11 +797,7 @@ def _extract_recommended_action_from_ec(official_url: str) -> str:
         return s
 
     # Common label on EC pages: "Recommended action:"
-    m = re.search(
-        r"(Recommended action[s]?:)\s*(.+?)(?=\s+(What:|When:|Where:|Additional information:|$))",
-        text,
-        flags=re.IGNORECASE,
-    )
+    m = _EC_RECOMMENDED_ACTION_RE.search(text)
     if not m:
         return ""
 
@@ -647,13 +810,16 @@ def _extract_recommended_action_from_ec(official_url: str) -> str:
 # Google Sheet + Google Drive integration
 # =============================================================================
 def _google_services() -> Tuple[Optional[Any], Optional[Any], str, str]:
-    sheet_id = (os.getenv("GOOGLE_SHEET_ID") or "").strip()
-    sa_json = (os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON") or "").strip()
-    drive_folder_id = (os.getenv("GOOGLE_DRIVE_FOLDER_ID") or "").strip()
+    sheet_id = _env("GOOGLE_SHEET_ID")
+    sa_json = _env("GOOGLE_SERVICE_ACCOUNT_JSON")
+    drive_folder_id = _env("GOOGLE_DRIVE_FOLDER_ID")
 
     if not sheet_id or not sa_json:
         return None, None, "", drive_folder_id
 
+    from google.oauth2 import service_account
+    from googleapiclient.discovery import build
+
     info = json.loads(sa_json)
     creds = service_account.Credentials.from_service_account_info(
         info,
@@ -667,6 +833,13 @@ def _google_services() -> Tuple[Optional[Any], Optional[Any], str, str]:
     drive_svc = build("drive", "v3", credentials=creds, cache_discovery=False)
     return sheets_svc, drive_svc, sheet_id, drive_folder_id
 
+def _init_google_services() -> Tuple[Optional[Any], Optional[Any], str, str]:
+    """_google_services(), with the Drive client also handed to the media helpers."""
+    global _DRIVE_SVC_FOR_MEDIA
+    sheets_svc, drive_svc, sheet_id, drive_folder_id = _google_services()
+    _DRIVE_SVC_FOR_MEDIA = drive_svc
+    return sheets_svc, drive_svc, sheet_id, drive_folder_id
+
 def load_care_statements_rows(sheets_svc: Optional[Any], default_sheet_id: str = "") -> list[dict]:
     """
     Loads CareStatements from Google Sheets.
@@ -691,6 +864,8 @@ def load_care_statements_rows(sheets_svc: Optional[Any], default_sheet_id: str =
     if sheets_svc is None:
         # Fallback: try ADC (only if your runner has it)
         try:
+            from googleapiclient.discovery import build
+
             sheets_svc = build("sheets", "v4")
         except Exception as e:
             print(f"⚠️ CareStatements: no Sheets service available: {e}")
@@ -847,12 +1022,6 @@ def pick_care_statement(care_rows: List[dict], colour: str, alert_type: str, pla
     want_colour = norm_colour(colour)
     want_platform = norm_platform(platform)
 
-    enabled_count = sum(1 for r in (care_rows or []) if enabled(r))
-    print(
-        f"CareStatements(DEBUG): rows={len(care_rows or [])} "
-        f"enabled={enabled_count} want=({want_colour} / {want_bucket} / {want_platform})"
-    )
-
     def row_colour(r: dict) -> str:
         return norm_colour(_get_first(r, ["colour", "color", "severity", "emoji"]))
 
@@ -887,11 +1056,25 @@ def pick_care_statement(care_rows: List[dict], colour: str, alert_type: str, pla
         except Exception:
             return 1
 
-    def matches(r: dict, c_req: str, b_req: str, p_req: str) -> bool:
-        rc = row_colour(r)
-        rb = row_bucket(r)
-        rp = row_platform(r)
+    # Normalize every row ONCE; the bucket passes below only compare strings.
+    #   (colour, bucket, platform, text, weight)
+    enabled_count = 0
+    norm_rows: List[Tuple[str, str, str, str, int]] = []
+    for r in (care_rows or []):
+        if not enabled(r):
+            continue
+        enabled_count += 1
+        txt = (row_text(r) or "").strip()
+        if not txt:
+            continue
+        norm_rows.append((row_colour(r), row_bucket(r), row_platform(r), txt, row_weight(r)))
 
+    print(
+        f"CareStatements(DEBUG): rows={len(care_rows or [])} "
+        f"enabled={enabled_count} want=({want_colour} / {want_bucket} / {want_platform})"
+    )
+
+    def matches(rc: str, rb: str, rp: str, c_req: str, b_req: str, p_req: str) -> bool:
         # colour filter
         if c_req and rc != c_req:
             return False
@@ -924,18 +1107,12 @@ def pick_care_statement(care_rows: List[dict], colour: str, alert_type: str, pla
         candidates: List[str] = []
         weights: List[int] = []
 
-        for r in (care_rows or []):
-            if not enabled(r):
-                continue
-            if not matches(r, bc, bb, bp):
-                continue
-
-            txt = (row_text(r) or "").strip()
-            if not txt:
+        for rc, rb, rp, txt, w in norm_rows:
+            if not matches(rc, rb, rp, bc, bb, bp):
                 continue
 
             candidates.append(txt)
-            weights.append(row_weight(r))
+            weights.append(w)
 
         if candidates:
             print(f"CareStatements(DEBUG): matched {len(candidates)} candidates using bucket=({bc}/{bb}/{bp})")
@@ -1088,6 +1265,10 @@ def pick_remixed_care_text(
 # =============================================================================
 # Google Drive curated photos (FIRST choice for images)
 # =============================================================================
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_DRIVE_REF_RE = re.compile(r"^drive://(.+)$")
+
+
 def pick_drive_images(
     drive_svc: Any,
     folder_id: str,
@@ -1098,7 +1279,7 @@ def pick_drive_images(
     if not drive_svc or not folder_id:
         return []
 
-    words = [w for w in re.split(r"[^a-z0-9]+", (alert_type_label or "").lower()) if w]
+    words = [w for w in _NON_ALNUM_RE.split((alert_type_label or "").lower()) if w]
     words = [w for w in words if len(w) >= 3]
 
     colour_words = {
@@ -1118,25 +1299,20 @@ def pick_drive_images(
 
     files = resp.get("files", []) or []
 
-    def score(name: str) -> int:
-        n = (name or "").lower()
-        sc = 0
-        for w in words:
-            if w in n:
-                sc += 3
-        for w in colour_words:
-            if w in n:
-                sc += 2
-        return sc
+    # Lower-case each filename once (parallel to files) instead of per comparison.
+    names_l = [(f.get("name") or "").lower() for f in files]
+
+    def score(n: str) -> int:
+        return 3 * sum(1 for w in words if w in n) + 2 * sum(1 for w in colour_words if w in n)
 
     scored = sorted(
-        files,
-        key=lambda f: (score(f.get("name", "")), f.get("modifiedTime", "")),
+        zip(files, names_l),
+        key=lambda fn: (score(fn[1]), fn[0].get("modifiedTime", "")),
         reverse=True,
     )
 
     picked: List[str] = []
-    for f in scored:
+    for f, _ in scored:
         if len(picked) >= max_images:
             break
         fid = (f.get("id") or "").strip()
@@ -1148,7 +1324,7 @@ def pick_drive_images(
 
 
 def download_drive_image_bytes(drive_svc: Any, drive_ref: str) -> Tuple[bytes, str]:
-    m = re.match(r"^drive://(.+)$", (drive_ref or "").strip())
+    m = _DRIVE_REF_RE.match((drive_ref or "").strip())
     if not m:
         raise RuntimeError("Invalid drive ref")
 
@@ -1180,7 +1356,7 @@ def is_image_url(url: str) -> bool:
         return False
 
     try:
-        r = requests.head(url, allow_redirects=True, headers={"User-Agent": USER_AGENT}, timeout=(5, 15))
+        r = _HTTP.head(url, allow_redirects=True, timeout=(5, 15))
         ct = (r.headers.get("Content-Type") or "").split(";")[0].strip().lower()
         if r.status_code < 400 and ct.startswith("image/"):
             return True
@@ -1188,7 +1364,7 @@ def is_image_url(url: str) -> bool:
         pass
 
     try:
-        r = requests.get(url, allow_redirects=True, headers={"User-Agent": USER_AGENT}, timeout=(5, 20))
+        r = _HTTP.get(url, allow_redirects=True, timeout=(5, 20))
         ct = (r.headers.get("Content-Type") or "").split(";")[0].strip().lower()
         return r.status_code < 400 and ct.startswith("image/")
     except Exception:
@@ -1200,7 +1376,7 @@ def fetch_on511_cameras() -> List[Dict[str, Any]]:
     if _ON511_CAMERAS_CACHE is not None:
         return _ON511_CAMERAS_CACHE
 
-    r = requests.get(ON511_CAMERAS_API, headers={"User-Agent": USER_AGENT}, timeout=(10, 30))
+    r = _HTTP.get(ON511_CAMERAS_API, timeout=(10, 30))
     r.raise_for_status()
     data = r.json()
     if not isinstance(data, list):
@@ -1298,6 +1474,8 @@ def apply_on511_bug(image_bytes: bytes, mime_type: str) -> Tuple[bytes, str]:
     BUG_PAD_RELATIVE = 0.015
 
     try:
+        from PIL import Image
+
         im = Image.open(BytesIO(image_bytes)).convert("RGBA")
         asset_path = Path(__file__).resolve().parent / "assets" / "On511_logo.png"
         logo = Image.open(asset_path).convert("RGBA")
@@ -1327,19 +1505,34 @@ def apply_on511_bug(image_bytes: bytes, mime_type: str) -> Tuple[bytes, str]:
         return image_bytes, mime_type
 
 
-def download_image_bytes(image_url: str) -> Tuple[bytes, str]:
+# X rejects still images over 5 MB, so X uploads don't download more than that.
+X_MAX_IMAGE_BYTES = 5 * 1024 * 1024
+
+
+# max_bytes is per destination (X passes X_MAX_IMAGE_BYTES); Facebook downloads are uncapped.
+def download_image_bytes(image_url: str, max_bytes: Optional[int] = None) -> Tuple[bytes, str]:
     image_url = (image_url or "").strip()
     if not image_url:
         raise RuntimeError("No image_url provided")
 
-    r = requests.get(image_url, headers={"User-Agent": USER_AGENT}, timeout=(10, 30), allow_redirects=True)
-    r.raise_for_status()
+    # Streamed so a non-image or oversized response is rejected before its body is read.
+    with _HTTP.get(image_url, timeout=(10, 30), allow_redirects=True, stream=True) as r:
+        r.raise_for_status()
+
+        content_type = (r.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if not content_type.startswith("image/"):
+            raise RuntimeError(f"URL did not return an image. Content-Type={content_type}")
 
-    content_type = (r.headers.get("Content-Type") or "").split(";")[0].strip().lower()
-    if not content_type.startswith("image/"):
-        raise RuntimeError(f"URL did not return an image. Content-Type={content_type}")
+        if max_bytes is not None and safe_int(r.headers.get("Content-Length"), 0) > max_bytes:
+            raise RuntimeError(f"Image too large ({r.headers.get('Content-Length')} bytes)")
+
+        buf = bytearray()
+        for chunk in r.iter_content(chunk_size=64 * 1024):
+            buf += chunk
+            if max_bytes is not None and len(buf) > max_bytes:
+                raise RuntimeError(f"Image too large (> {max_bytes} bytes)")
+        data = bytes(buf)
 
-    data = r.content
     u = image_url.lower()
     if "511on.ca" in u and "/cctv/" in u:
         data, content_type = apply_on511_bug(data, content_type)
@@ -1351,6 +1544,7 @@ def download_image_bytes(image_url: str) -> Tuple[bytes, str]:
 # Facebook image loader wiring
 # =============================================================================
 _DRIVE_SVC_FOR_MEDIA: Optional[Any] = None
+_DRIVE_MEDIA_LOCK = threading.Lock()
 
 
 def fb_load_image_bytes(ref: str) -> Tuple[bytes, str]:
@@ -1371,7 +1565,8 @@ def fb_load_image_bytes(ref: str) -> Tuple[bytes, str]:
     if ref.startswith("drive://"):
         if not _DRIVE_SVC_FOR_MEDIA:
             raise RuntimeError("Drive ref provided but Drive service is not configured")
-        return download_drive_image_bytes(_DRIVE_SVC_FOR_MEDIA, ref)
+        with _DRIVE_MEDIA_LOCK:
+            return download_drive_image_bytes(_DRIVE_SVC_FOR_MEDIA, ref)
 
     return download_image_bytes(ref)
 
@@ -1379,23 +1574,56 @@ def fb_load_image_bytes(ref: str) -> Tuple[bytes, str]:
 fb.load_image_bytes = fb_load_image_bytes
 
 
+# Temp media files are keyed by a hash of the ref, so the same Drive photo /
+# camera frame is reused instead of re-downloaded while it is still fresh.
+TMP_MEDIA_DIR = Path(tempfile.gettempdir())
+TMP_MEDIA_PREFIX = "tay_media_"
+TMP_MEDIA_TTL_SECONDS = 300
+
+
+def _tmp_media_is_fresh(p: Path) -> bool:
+    try:
+        return (time.time() - p.stat().st_mtime) < TMP_MEDIA_TTL_SECONDS
+    except OSError:
+        return False
+
+
+def _materialize_one(ref: str) -> str:
+    key = hashlib.blake2b(ref.encode("utf-8"), digest_size=8).hexdigest()
+
+    for ext in ("png", "jpg"):
+        p = TMP_MEDIA_DIR / f"{TMP_MEDIA_PREFIX}{key}.{ext}"
+        if _tmp_media_is_fresh(p):
+            return str(p)
+
+    b, mt = fb_load_image_bytes(ref)
+    ext = "png" if mt == "image/png" else "jpg"
+    p = TMP_MEDIA_DIR / f"{TMP_MEDIA_PREFIX}{key}.{ext}"
+    p.write_bytes(b)
+    return str(p)
+
+
 def materialize_images_for_facebook(image_refs: List[str]) -> List[str]:
-    out_paths: List[str] = []
-    for i, ref in enumerate([x for x in (image_refs or []) if (x or "").strip()][:10]):
-        b, mt = fb_load_image_bytes(ref)
-        ext = "png" if mt == "image/png" else "jpg"
-        p = f"/tmp/tay_media_{i}.{ext}"
-        with open(p, "wb") as f:
-            f.write(b)
-        out_paths.append(p)
-    return out_paths
+    refs = [x for x in (image_refs or []) if (x or "").strip()][:10]
+    if len(refs) <= 1:
+        return [_materialize_one(r) for r in refs]
+    # Downloads are independent; map() keeps the carousel order.
+    with ThreadPoolExecutor(max_workers=min(4, len(refs))) as ex:
+        return list(ex.map(_materialize_one, refs))
 
 
 def cleanup_tmp_media_files(paths: List[str]) -> None:
+    """
+    Removes OUR temp media files once they are past TMP_MEDIA_TTL_SECONDS.
+    Fresh files are kept so the next post (or next run on the same runner) can reuse them.
+    """
     for p in paths or []:
         try:
-            if isinstance(p, str) and p.startswith("/tmp/tay_media_"):
-                os.remove(p)
+            pp = Path(p) if isinstance(p, str) else None
+            if pp is None or pp.parent != TMP_MEDIA_DIR or not pp.name.startswith(TMP_MEDIA_PREFIX):
+                continue
+            if not _tmp_media_is_fresh(pp):
+                pp.unlink()
         except Exception:
             pass
 
@@ -1403,6 +1631,13 @@ def cleanup_tmp_media_files(paths: List[str]) -> None:
 # =============================================================================
 # X OAuth2 (posting) + OAuth1 (media upload)
 # =============================================================================
+# One keep-alive session for api.x.com and upload.twitter.com. urllib3 keeps a
+# separate pool per host, so the token refresh, media uploads and the tweet
+# reuse their connections instead of paying a fresh TLS handshake each call.
+_X_SESSION = requests.Session()
+_X_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0))
+_X_SESSION.headers["User-Agent"] = USER_AGENT
+
 def write_rotated_refresh_token(new_refresh: str) -> None:
     new_refresh = (new_refresh or "").strip()
     if not new_refresh:
@@ -1411,10 +1646,19 @@ def write_rotated_refresh_token(new_refresh: str) -> None:
         f.write(new_refresh)
 
 
+# X rotates the refresh token on every refresh, so a second refresh in the same
+# run must use the newest one. The access token is reused until shortly before
+# it expires.
+_X_TOKEN_CACHE: Dict[str, Any] = {"access": "", "refresh": "", "exp": 0.0}
+
+
 def get_oauth2_access_token() -> str:
-    client_id = os.getenv("X_CLIENT_ID", "").strip()
-    client_secret = os.getenv("X_CLIENT_SECRET", "").strip()
-    refresh_token = os.getenv("X_REFRESH_TOKEN", "").strip()
+    if _X_TOKEN_CACHE["access"] and time.time() < _X_TOKEN_CACHE["exp"] - 60:
+        return _X_TOKEN_CACHE["access"]
+
+    client_id = _env("X_CLIENT_ID")
+    client_secret = _env("X_CLIENT_SECRET")
+    refresh_token = _X_TOKEN_CACHE["refresh"] or _env("X_REFRESH_TOKEN")
 
     missing = [k for k, v in [
         ("X_CLIENT_ID", client_id),
@@ -1428,10 +1672,9 @@ def get_oauth2_access_token() -> str:
     headers = {
         "Authorization": f"Basic {basic}",
         "Content-Type": "application/x-www-form-urlencoded",
-        "User-Agent": USER_AGENT,
     }
 
-    r = requests.post(
+    r = _X_SESSION.post(
         "https://api.x.com/2/oauth2/token",
         headers=headers,
         data={"grant_type": "refresh_token", "refresh_token": refresh_token},
@@ -1450,14 +1693,17 @@ def get_oauth2_access_token() -> str:
         print("⚠️ X refresh token rotated. Workflow will update the repo secret.")
         write_rotated_refresh_token(new_refresh)
 
+    _X_TOKEN_CACHE["access"] = access
+    _X_TOKEN_CACHE["refresh"] = new_refresh or refresh_token
+    _X_TOKEN_CACHE["exp"] = time.time() + safe_int(payload.get("expires_in"), 7200)
     return access
 
 
 def x_upload_media(image_ref: str) -> str:
-    api_key = os.getenv("X_API_KEY", "").strip()
-    api_secret = os.getenv("X_API_SECRET", "").strip()
-    access_token = os.getenv("X_ACCESS_TOKEN", "").strip()
-    access_secret = os.getenv("X_ACCESS_TOKEN_SECRET", "").strip()
+    api_key = _env("X_API_KEY")
+    api_secret = _env("X_API_SECRET")
+    access_token = _env("X_ACCESS_TOKEN")
+    access_secret = _env("X_ACCESS_TOKEN_SECRET")
 
     missing = [k for k, v in [
         ("X_API_KEY", api_key),
@@ -1471,14 +1717,18 @@ def x_upload_media(image_ref: str) -> str:
     if image_ref.startswith("drive://"):
         if not _DRIVE_SVC_FOR_MEDIA:
             raise RuntimeError("Drive ref provided but Drive service is not configured")
-        img_bytes, mime_type = download_drive_image_bytes(_DRIVE_SVC_FOR_MEDIA, image_ref)
+        # The Drive client (httplib2) is not thread-safe; uploads run in parallel.
+        with _DRIVE_MEDIA_LOCK:
+            img_bytes, mime_type = download_drive_image_bytes(_DRIVE_SVC_FOR_MEDIA, image_ref)
     else:
-        img_bytes, mime_type = download_image_bytes(image_ref)
+        img_bytes, mime_type = download_image_bytes(image_ref, max_bytes=X_MAX_IMAGE_BYTES)
+
+    from requests_oauthlib import OAuth1
 
     auth = OAuth1(api_key, api_secret, access_token, access_secret)
     upload_url = "https://upload.twitter.com/1.1/media/upload.json"
     files = {"media": ("image", img_bytes, mime_type)}
-    r = requests.post(upload_url, auth=auth, files=files, timeout=60)
+    r = _X_SESSION.post(upload_url, auth=auth, files=files, timeout=60)
 
     print("X media upload status:", r.status_code)
     if r.status_code >= 400:
@@ -1492,6 +1742,14 @@ def x_upload_media(image_ref: str) -> str:
     return media_id
 
 
+def _safe_upload(image_ref: str) -> Optional[str]:
+    try:
+        return x_upload_media(image_ref)
+    except Exception as e:
+        print(f"⚠️ X media skipped for one image: {e}")
+        return None
+
+
 def post_to_x(text: str, image_refs: Optional[List[str]] = None) -> Dict[str, Any]:
     url = "https://api.x.com/2/tweets"
     access_token = get_oauth2_access_token()
@@ -1500,21 +1758,19 @@ def post_to_x(text: str, image_refs: Optional[List[str]] = None) -> Dict[str, An
 
     image_refs = [u for u in (image_refs or []) if (u or "").strip()]
     if image_refs:
-        media_ids: List[str] = []
-        for u in image_refs[:4]:
-            try:
-                media_ids.append(x_upload_media(u))
-            except Exception as e:
-                print(f"⚠️ X media skipped for one image: {e}")
+        image_refs = image_refs[:4]
+        # Uploads are independent; map() keeps the media order of image_refs.
+        with ThreadPoolExecutor(max_workers=len(image_refs)) as ex:
+            results = list(ex.map(_safe_upload, image_refs))
+        media_ids = [r for r in results if r]
         if media_ids:
             payload["media"] = {"media_ids": media_ids}
 
-    r = requests.post(
+    r = _X_SESSION.post(
         url,
         json=payload,
         headers={
             "Authorization": f"Bearer {access_token}",
-            "User-Agent": USER_AGENT,
             "Content-Type": "application/json",
         },
         timeout=20,
@@ -1566,20 +1822,20 @@ def ensure_rss_exists() -> None:
     if os.path.exists(RSS_PATH):
         return
 
-    rss = ET.Element("rss", version="2.0")
-    channel = ET.SubElement(rss, "channel")
+    rss = RSS_ET.Element("rss", version="2.0")
+    channel = RSS_ET.SubElement(rss, "channel")
 
-    ET.SubElement(channel, "title").text = "Tay Township Weather Statements"
-    ET.SubElement(channel, "link").text = "https://commsconnect.github.io/tay-weather-rss/"
-    ET.SubElement(channel, "description").text = "Automated weather statements and alerts for Tay Township area."
-    ET.SubElement(channel, "language").text = "en-ca"
+    RSS_ET.SubElement(channel, "title").text = "Tay Township Weather Statements"
+    RSS_ET.SubElement(channel, "link").text = "https://commsconnect.github.io/tay-weather-rss/"
+    RSS_ET.SubElement(channel, "description").text = "Automated weather statements and alerts for Tay Township area."
+    RSS_ET.SubElement(channel, "language").text = "en-ca"
 
-    ET.ElementTree(rss).write(RSS_PATH, encoding="utf-8", xml_declaration=True)
+    RSS_ET.ElementTree(rss).write(RSS_PATH, encoding="utf-8", xml_declaration=True)
 
 
 def load_rss_tree() -> Tuple[ET.ElementTree, ET.Element]:
     ensure_rss_exists()
-    tree = ET.parse(RSS_PATH)
+    tree = RSS_ET.parse(RSS_PATH)
     root = tree.getroot()
     channel = root.find("channel")
     if channel is None:
@@ -1587,28 +1843,38 @@ def load_rss_tree() -> Tuple[ET.ElementTree, ET.Element]:
     return tree, channel
 
 
-def rss_item_exists(channel: ET.Element, guid_text: str) -> bool:
-    for item in channel.findall("item"):
-        guid = item.find("guid")
-        if guid is not None and (guid.text or "").strip() == guid_text:
-            return True
-    return False
+_RSS_CHANNEL_META_TAGS = frozenset({"title", "link", "description", "language", "lastBuildDate"})
 
 
-def add_rss_item(channel: ET.Element, title: str, link: str, guid: str, pub_date: str, description: str) -> None:
-    item = ET.Element("item")
-    ET.SubElement(item, "title").text = title
-    ET.SubElement(item, "link").text = link
-    g = ET.SubElement(item, "guid")
+def rss_item_insert_index(channel: ET.Element) -> int:
+    """Index just past the channel metadata, where new items go (newest first)."""
+    insert_index = 0
+    for i, child in enumerate(channel):
+        if child.tag in _RSS_CHANNEL_META_TAGS:
+            insert_index = i + 1
+    return insert_index
+
+
+def add_rss_item(
+    channel: ET.Element,
+    title: str,
+    link: str,
+    guid: str,
+    pub_date: str,
+    description: str,
+    insert_index: Optional[int] = None,
+) -> None:
+    item = RSS_ET.Element("item")
+    RSS_ET.SubElement(item, "title").text = title
+    RSS_ET.SubElement(item, "link").text = link
+    g = RSS_ET.SubElement(item, "guid")
     g.text = guid
     g.set("isPermaLink", "false")
-    ET.SubElement(item, "pubDate").text = pub_date
-    ET.SubElement(item, "description").text = description
+    RSS_ET.SubElement(item, "pubDate").text = pub_date
+    RSS_ET.SubElement(item, "description").text = description
 
-    insert_index = 0
-    for i, child in enumerate(list(channel)):
-        if child.tag in {"title", "link", "description", "language", "lastBuildDate"}:
-            insert_index = i + 1
+    if insert_index is None:
+        insert_index = rss_item_insert_index(channel)
     channel.insert(insert_index, item)
 
 
@@ -1616,8 +1882,9 @@ def trim_rss_items(channel: ET.Element, max_items: int) -> None:
     items = channel.findall("item")
     if len(items) <= max_items:
         return
-    for item in items[max_items:]:
-        channel.remove(item)
+    # One slice rebuild instead of a linear Element.remove() scan per item.
+    drop = {id(item) for item in items[max_items:]}
+    channel[:] = [child for child in channel if id(child) not in drop]
 
 
 def build_rss_description_from_atom(entry: Dict[str, Any], more_url: str) -> str:
@@ -1640,13 +1907,24 @@ def build_rss_description_from_atom(entry: Dict[str, Any], more_url: str) -> str
 
 # Remove the specific EC area parenthetical from anywhere in a string
 _TAY_AREA_PAREN_RE = re.compile(r"\s*\(\s*Tay Township area[^)]*\)\s*", flags=re.IGNORECASE)
+_MULTI_SPACE_RE = re.compile(r"[ \t]{2,}")
 
 def strip_tay_area_paren(s: str) -> str:
     s = (s or "")
     s = _TAY_AREA_PAREN_RE.sub(" ", s)
-    s = re.sub(r"[ \t]{2,}", " ", s)
+    s = _MULTI_SPACE_RE.sub(" ", s)
     return s.strip()
 
+# Banner-title shapes shared by the social headline and the CareStatements bucket.
+_TRAILING_PAREN_RE = re.compile(r"\s*\(.*?\)\s*$")
+_COLOUR_PRODUCT_HAZARD_RE = re.compile(
+    r"^(yellow|orange|red)\s+(warning|watch|advisory|statement)\s*[-–—]\s*(.+)$",
+    re.IGNORECASE,
+)
+_HAZARD_PRODUCT_RE = re.compile(r"^(.+?)\s+(warning|watch|advisory|statement)$", re.IGNORECASE)
+_SPECIAL_WEATHER_STATEMENT_RE = re.compile(r"special\s+weather\s+statement", re.IGNORECASE)
+
+
 def _pretty_title_for_social(title: str) -> str:
     """Build the first-line headline in your required format (minus the emoji).
 
@@ -1666,28 +1944,24 @@ def _pretty_title_for_social(title: str) -> str:
     """
     t = (title or "").strip()
     t = strip_tay_area_paren(atom_title_for_tay(t))
-    t = re.sub(r"\s*\(.*?\)\s*$", "", t).strip()
+    t = _TRAILING_PAREN_RE.sub("", t).strip()
 
     # Pattern 1: "Yellow Watch - Winter Storm"
-    m = re.match(
-        r"^(yellow|orange|red)\s+(warning|watch|advisory|statement)\s*[-–—]\s*(.+)$",
-        t,
-        flags=re.IGNORECASE,
-    )
+    m = _COLOUR_PRODUCT_HAZARD_RE.match(t)
     if m:
         product = m.group(2).lower().strip()
         hazard = (m.group(3) or "").strip().upper()
         return f"{hazard} {product} in Tay Township"
 
     # Pattern 2: "Winter Storm Watch" / "Wind Warning" etc.
-    m2 = re.match(r"^(.+?)\s+(warning|watch|advisory|statement)$", t, flags=re.IGNORECASE)
+    m2 = _HAZARD_PRODUCT_RE.match(t)
     if m2:
         hazard = (m2.group(1) or "").strip().upper()
         product = (m2.group(2) or "").strip().lower()
         return f"{hazard} {product} in Tay Township"
 
     # Pattern 3: "Special Weather Statement"
-    if re.search(r"special\s+weather\s+statement", t, flags=re.IGNORECASE):
+    if _SPECIAL_WEATHER_STATEMENT_RE.search(t):
         return "SPECIAL WEATHER statement in Tay Township"
 
     # Fallback: keep whatever EC provided, but still append your location phrase.
@@ -1707,26 +1981,45 @@ def _hazard_bucket_key_for_sheet(title: str) -> str:
     """
     t = (title or "").strip()
     t = strip_tay_area_paren(atom_title_for_tay(t))
-    t = re.sub(r"\s*\(.*?\)\s*$", "", t).strip()
+    t = _TRAILING_PAREN_RE.sub("", t).strip()
 
-    m = re.match(
-        r"^(yellow|orange|red)\s+(warning|watch|advisory|statement)\s*[-–—]\s*(.+)$",
-        t,
-        flags=re.IGNORECASE,
-    )
+    m = _COLOUR_PRODUCT_HAZARD_RE.match(t)
     if m:
         return (m.group(3) or "").strip().lower()
 
-    m2 = re.match(r"^(.+?)\s+(warning|watch|advisory|statement)$", t, flags=re.IGNORECASE)
+    m2 = _HAZARD_PRODUCT_RE.match(t)
     if m2:
         return (m2.group(1) or "").strip().lower()
 
-    if re.search(r"special\s+weather\s+statement", t, flags=re.IGNORECASE):
+    if _SPECIAL_WEATHER_STATEMENT_RE.search(t):
         return "special weather"
 
     # As a last resort, return the whole title. Better to match 'any' than fail hard.
     return t.lower()
-def build_x_post_text(entry: Dict[str, Any], more_url: str, care: str = "", custom_x: str = "") -> str:
+def social_title_line(entry: Dict[str, Any]) -> str:
+    """Emoji + pretty headline shared by the X and Facebook builders."""
+    title_raw = strip_tay_area_paren(atom_title_for_tay((entry.get("title") or "").strip()))
+    sev = "🟢" if is_alert_ended(title_raw, entry.get("summary") or "") else severity_emoji(title_raw)
+    return f"{sev} {_pretty_title_for_social(title_raw)}" if sev else _pretty_title_for_social(title_raw)
+
+
+def social_details_lines(entry: Dict[str, Any]) -> List[str]:
+    """EC What/When lines for an entry; [] when the page can't be read."""
+    try:
+        return _extract_details_lines_from_ec((entry.get("link") or "").strip())
+    except Exception as e:
+        print(f"⚠️ EC details parse failed: {e}")
+        return []
+
+
+def build_x_post_text(
+    entry: Dict[str, Any],
+    more_url: str,
+    care: str = "",
+    custom_x: str = "",
+    title_line: str = "",
+    details_lines: Optional[List[str]] = None,
+) -> str:
     """X post builder with character limit handling (280 chars).
 
     Requirements:
@@ -1739,17 +2032,9 @@ def build_x_post_text(entry: Dict[str, Any], more_url: str, care: str = "", cust
       1) Custom text (Telegram ✏️ Custom) if it fits
       2) Care statement if it fits (and is present)
     """
-    title_raw = strip_tay_area_paren(atom_title_for_tay((entry.get("title") or "").strip()))
-    official = (entry.get("link") or "").strip()
-    sev = "🟢" if is_alert_ended(title_raw, entry.get("summary") or "") else severity_emoji(title_raw)
-
-    title_line = f"{sev} {_pretty_title_for_social(title_raw)}" if sev else _pretty_title_for_social(title_raw)
-
-    details_lines: List[str] = []
-    try:
-        details_lines = _extract_details_lines_from_ec(official)
-    except Exception as e:
-        print(f"⚠️ EC details parse failed (X): {e}")
+    title_line = title_line or social_title_line(entry)
+    if details_lines is None:
+        details_lines = social_details_lines(entry)
 
     def _try_append_optional(base_text: str, *, allow_care: bool) -> str:
         """Append custom and care text if they fit."""
@@ -1769,38 +2054,50 @@ def build_x_post_text(entry: Dict[str, Any], more_url: str, care: str = "", cust
 
         return out
 
+    title_line = title_line.strip()
+    closing = f"Environment Canada\nMore: {more_url}\n#TayTownship #ONStorm"
+
+    def _compose(lines: List[str]) -> str:
+        return "\n".join([title_line, "", *lines, "", closing])
+
+    # len(_compose(lines)) == base_len + sum(map(len, lines)) + len(lines),
+    # so each layout is sized before any string is joined.
+    base_len = len(title_line) + 3 + len(closing)
+
     # -------------------------------------------------------------------------
     # VERSION 1: MAX (2 details lines)
     # - We generally do NOT attempt to add care here (rarely fits).
     # -------------------------------------------------------------------------
-    parts_max = [title_line, "", *details_lines[:2], "", "Environment Canada", f"More: {more_url}", "#TayTownship #ONStorm"]
-    text_max = "\n".join(parts_max).strip()
-    if len(text_max) <= 280:
-        return _try_append_optional(text_max, allow_care=False)
+    max_lines = details_lines[:2]
+    if base_len + sum(map(len, max_lines)) + len(max_lines) <= 280:
+        return _try_append_optional(_compose(max_lines), allow_care=False)
 
     # -------------------------------------------------------------------------
     # VERSION 2: MEDIUM (1 details line)
     # - Allow care if space remains.
     # -------------------------------------------------------------------------
-    if details_lines:
-        parts_med = [title_line, "", details_lines[0], "", "Environment Canada", f"More: {more_url}", "#TayTownship #ONStorm"]
-        text_med = "\n".join(parts_med).strip()
-        if len(text_med) <= 280:
-            return _try_append_optional(text_med, allow_care=True)
+    if details_lines and base_len + len(details_lines[0]) + 1 <= 280:
+        return _try_append_optional(_compose(details_lines[:1]), allow_care=True)
 
     # -------------------------------------------------------------------------
     # VERSION 3: MINIMAL (No details)
     # - Allow care if space remains.
     # -------------------------------------------------------------------------
-    parts_min = [title_line, "", "Environment Canada", f"More: {more_url}", "#TayTownship #ONStorm"]
-    text_min = "\n".join(parts_min).strip()
+    text_min = f"{title_line}\n\n{closing}"
     if len(text_min) <= 280:
         return _try_append_optional(text_min, allow_care=True)
 
     return text_min[:277].rstrip() + "..."
 
 
-def build_facebook_post_text(entry: Dict[str, Any], care: str, more_url: str, custom_fb: str = "") -> str:
+def build_facebook_post_text(
+    entry: Dict[str, Any],
+    care: str,
+    more_url: str,
+    custom_fb: str = "",
+    title_line: str = "",
+    details_lines: Optional[List[str]] = None,
+) -> str:
     """Facebook post builder (your fixed format).
 
     Includes:
@@ -1815,17 +2112,10 @@ def build_facebook_post_text(entry: Dict[str, Any], care: str, more_url: str, cu
       More: <short URL>
       #TayTownship #ONStorm   (hashtags may evolve later)
     """
-    title_raw = strip_tay_area_paren(atom_title_for_tay((entry.get("title") or "").strip()))
     official = (entry.get("link") or "").strip()
-
-    sev = "🟢" if is_alert_ended(title_raw, entry.get("summary") or "") else severity_emoji(title_raw)
-    title_line = f"{sev} {_pretty_title_for_social(title_raw)}" if sev else _pretty_title_for_social(title_raw)
-
-    details_lines: List[str] = []
-    try:
-        details_lines = _extract_details_lines_from_ec(official)
-    except Exception as e:
-        print(f"⚠️ EC details parse failed (FB): {e}")
+    title_line = title_line or social_title_line(entry)
+    if details_lines is None:
+        details_lines = social_details_lines(entry)
 
     recommended_action = ""
     try:
@@ -1928,17 +2218,14 @@ def wait_for_decision_safe(state: Dict[str, Any], token: str) -> str:
       - state_path ensures we see decisions saved to disk.
       - ingest_each_poll ensures we process Telegram button clicks while waiting.
     """
-    wait_seconds = int(os.getenv("TELEGRAM_WAIT_SECONDS", "600"))
-    ttl_min = int(os.getenv("TELEGRAM_APPROVAL_TTL_MIN", "60"))
-
     try:
         d = wait_for_decision(
             st=state,
             token=token,
             save_state_fn=save_state,
-            ttl_min=ttl_min,
+            ttl_min=TELEGRAM_APPROVAL_TTL_MIN,
             poll_interval_seconds=4,
-            max_wait_seconds=wait_seconds,
+            max_wait_seconds=TELEGRAM_WAIT_SECONDS,
             state_path=STATE_PATH,
             ingest_each_poll=True,
         )
@@ -1962,11 +2249,6 @@ def main() -> None:
         except Exception:
             pass
 
-    sheets_svc, drive_svc, sheet_id, drive_folder_id = _google_services()
-
-    global _DRIVE_SVC_FOR_MEDIA
-    _DRIVE_SVC_FOR_MEDIA = drive_svc
-
     # -------------------------------------------------------------------------
     # RUN MODE: TEST (Telegram-first, NO POST)
     # -------------------------------------------------------------------------
@@ -1974,6 +2256,8 @@ def main() -> None:
         if not TELEGRAM_ENABLE_GATE:
             print("RUN_MODE is a Telegram test mode, but TELEGRAM_ENABLE_GATE=false. Exiting cleanly.")
             return
+
+        sheets_svc, drive_svc, sheet_id, drive_folder_id = _init_google_services()
     
         # In test modes we always show a Telegram preview and accept buttons,
         # but we NEVER post to X/Facebook. This path is used to validate:
@@ -1999,7 +2283,7 @@ def main() -> None:
             or (created_at and is_expired(st, token))
             or (token and decision_for(st, token) in ("approved", "denied"))
         ):
-            token = hashlib.sha1(f"test:{RUN_MODE}:{dt.datetime.utcnow().isoformat()}".encode("utf-8")).hexdigest()[:10]
+            token = hashlib.sha1(f"test:{RUN_MODE}:{time.time()}".encode("utf-8")).hexdigest()[:10]
             st["test_gate_token"] = token
             save_state(st)
     
@@ -2171,7 +2455,7 @@ def main() -> None:
                 or (created_at and is_expired(st, token))
                 or (token and decision_for(st, token) in ("approved", "denied"))
             ):
-                token = hashlib.sha1(f"test:{dt.datetime.utcnow().isoformat()}".encode("utf-8")).hexdigest()[:10]
+                token = hashlib.sha1(f"test:{time.time()}".encode("utf-8")).hexdigest()[:10]
                 st["test_gate_token"] = token
                 save_state(st)
 
@@ -2235,37 +2519,56 @@ def main() -> None:
     # -------------------------------------------------------------------------
     state = load_state()
 
-    # Load CareStatements once per run
-    care_rows: List[dict] = []
-    try:
-        care_rows = load_care_statements_rows(sheets_svc, sheet_id)
-        print(f"CareStatements: loaded {len(care_rows)} rows")
-        if care_rows:
-            print("CareStatements: sample keys:", sorted(care_rows[0].keys()))
-    except Exception as e:
-        print(f"⚠️ CareStatements failed to load (will post without care text): {e}")
-        care_rows = []
-
-    posted = set(state.get("posted_guids", []))
-    posted_text_hashes = set(state.get("posted_text_hashes", []))
-
-    tree, channel = load_rss_tree()
-
+    # The feed is checked before anything else is set up: most runs end at the 304.
+    # Keyed by URL so validators from a previously configured feed are never
+    # sent to a different ALERT_FEED_URL (which could produce a false 304).
+    feed_validators = dict((state.get("http_validators") or {}).get(ALERT_FEED_URL) or {})
     try:
-        feed_entries = fetch_feed_entries(ALERT_FEED_URL)
+        feed_entries = fetch_feed_entries(ALERT_FEED_URL, validators=feed_validators)
     except Exception as e:
         print(f"⚠️ Feed unavailable: {e}")
         print("Exiting cleanly; will retry on next scheduled run.")
         return
 
+    # 304: same feed as the last run, which already handled it. Telegram ingest
+    # and reminders are skipped too, as they were before: an already-handled
+    # feed ends at the same-timestamp or not-alerting exit, ahead of the gate.
+    if feed_entries is None:
+        print("Feed not modified since last run (304). Skipping.")
+        return
+
+    # The gate helpers save state mid-run, so the new validators go into state
+    # only at the all-clear exit, the same-timestamp exit and after the alert
+    # loop. A denied or timed-out all-clear leaves them out, and is retried.
+    def _commit_feed_validators() -> None:
+        state.setdefault("http_validators", {})[ALERT_FEED_URL] = feed_validators
+
+    # CareStatements: loaded at most once per run, and only when an entry
+    # actually needs a care statement (most runs exit before that point).
+    care_rows: Optional[List[dict]] = None
+
+    # Sets for lookups; the deques keep oldest-first order and drop the oldest
+    # entry on append once full.
+    posted_order: Deque[str] = collections.deque(state.get("posted_guids", []), maxlen=MAX_POSTED_HISTORY)
+    posted = set(posted_order)
+    posted_text_hash_order: Deque[str] = collections.deque(
+        state.get("posted_text_hashes", []), maxlen=MAX_POSTED_HISTORY
+    )
+    posted_text_hashes = set(posted_text_hash_order)
+
+    sheets_svc, drive_svc, sheet_id, drive_folder_id = _init_google_services()
+
+    tree, channel = load_rss_tree()
+    existing_guids = {(g.text or "").strip() for g in channel.iterfind("item/guid")}
+    # Items only ever go in after the metadata, so this index never moves.
+    rss_insert_at = rss_item_insert_index(channel)
+
     # -------------------------------------------------------------------------
     # SIMPLE CHANGE TRACKING (EC updated timestamp + going green once)
     # -------------------------------------------------------------------------
     def _is_general_bulletin(e: dict) -> bool:
-        t = normalize_alert_title(atom_title_for_tay((e.get("title") or "").strip())).lower()
-        s = ((e.get("summary") or "")).lower()
-        markers = ("no alerts in effect", "no watches or warnings in effect")
-        return any(m in t for m in markers) or any(m in s for m in markers)
+        t = normalize_alert_title(atom_title_for_tay((e.get("title") or "").strip()))
+        return bool(_GENERAL_BULLETIN_RE.search(t) or _GENERAL_BULLETIN_RE.search(e.get("summary") or ""))
 
     actionable = [e for e in feed_entries if not _is_general_bulletin(e)]
     newest = actionable[0] if actionable else None
@@ -2332,6 +2635,7 @@ def main() -> None:
         # Mark state as green/clear and exit
         state["last_had_alert"] = False
         state["last_ec_updated_iso"] = ""
+        _commit_feed_validators()
         save_state(state)
         return
 
@@ -2341,6 +2645,7 @@ def main() -> None:
     if state.get("last_ec_updated_iso") == newest_updated_iso:
         print("No Environment Canada update (same updated timestamp). Skipping.")
         state["last_had_alert"] = True
+        _commit_feed_validators()
         save_state(state)
         return
 
@@ -2352,25 +2657,24 @@ def main() -> None:
     def entry_guid(entry: dict) -> str:
         return (entry.get("id") or entry.get("link") or "").strip()
 
+    # posted/posted_text_hashes are written back to state only when they change.
+    # A successful post flushes immediately so a crash can't cause a repost.
+    dirty = False
+
     for entry in feed_entries:
         guid = entry_guid(entry)
         if not guid:
             continue
 
         title = normalize_alert_title(atom_title_for_tay((entry.get("title") or "Weather alert").strip()))
-        title_l = (title or "").lower()
-        summary_l = ((entry.get("summary") or "")).lower()
-
-        ended = is_alert_ended(title, entry.get("summary") or "")
+        summary = entry.get("summary") or ""
 
-        general_non_alert_markers = (
-            "no alerts in effect",
-            "no watches or warnings in effect",
-        )
+        ended = is_alert_ended(title, summary)
 
-        if any(m in title_l for m in general_non_alert_markers) or any(m in summary_l for m in general_non_alert_markers):
+        if _GENERAL_BULLETIN_RE.search(title) or _GENERAL_BULLETIN_RE.search(summary):
             print(f"Info: general bulletin — skipping social post: {title}")
-            posted.add(guid)
+            _remember(posted, posted_order, guid)
+            dirty = True
             continue
 
         pub_dt = entry.get("updated_dt") or dt.datetime.now(dt.timezone.utc)
@@ -2378,8 +2682,17 @@ def main() -> None:
         link = more_url
         description = build_rss_description_from_atom(entry, more_url=more_url)
 
-        if not rss_item_exists(channel, guid):
-            add_rss_item(channel, title=title, link=link, guid=guid, pub_date=pub_date, description=description)
+        if guid not in existing_guids:
+            add_rss_item(
+                channel,
+                title=title,
+                link=link,
+                guid=guid,
+                pub_date=pub_date,
+                description=description,
+                insert_index=rss_insert_at,
+            )
+            existing_guids.add(guid)
 
         if guid in posted:
             continue
@@ -2396,6 +2709,16 @@ def main() -> None:
         hazard_bucket = _hazard_bucket_key_for_sheet(title_raw)
         sev = severity_emoji(title_raw)
 
+        if care_rows is None:
+            try:
+                care_rows = load_care_statements_rows(sheets_svc, sheet_id)
+                print(f"CareStatements: loaded {len(care_rows)} rows")
+                if care_rows:
+                    print("CareStatements: sample keys:", sorted(care_rows[0].keys()))
+            except Exception as e:
+                print(f"⚠️ CareStatements failed to load (will post without care text): {e}")
+                care_rows = []
+
         care = ""
         if care_rows:
             try:
@@ -2412,24 +2735,36 @@ def main() -> None:
                 print(f"⚠️ Care statement match failed: {e}")
                 care = ""
 
-        image_refs = choose_images_for_alert(
-            drive_svc=drive_svc,
-            drive_folder_id=drive_folder_id,
-            alert_kind=alert_kind,
-            alert_type_label=title_raw,
-            severity=sev,
-        )
+        title_line = social_title_line(entry)
+        details_lines = social_details_lines(entry)
 
         # X: include care only if it fits (builder enforces length rules)
-        x_text = build_x_post_text(entry, more_url=more_url, care=care)
-        fb_text = build_facebook_post_text(entry, care=care, more_url=more_url)
+        x_text = build_x_post_text(
+            entry, more_url=more_url, care=care, title_line=title_line, details_lines=details_lines
+        )
+        fb_text = build_facebook_post_text(
+            entry, care=care, more_url=more_url, title_line=title_line, details_lines=details_lines
+        )
 
         h = text_hash(x_text)
         if h in posted_text_hashes:
             print("Social skipped: duplicate text hash already posted")
-            posted.add(guid)
+            _remember(posted, posted_order, guid)
+            dirty = True
             continue
 
+        # Images (Drive listing / 511 lookup) are only picked once the entry
+        # survives dedupe, and only if a preview or a post will use them.
+        image_refs: List[str] = []
+        if TELEGRAM_ENABLE_GATE or EFFECTIVE_ENABLE_X_POSTING or EFFECTIVE_ENABLE_FB_POSTING:
+            image_refs = choose_images_for_alert(
+                drive_svc=drive_svc,
+                drive_folder_id=drive_folder_id,
+                alert_kind=alert_kind,
+                alert_type_label=title_raw,
+                severity=sev,
+            )
+
         # ---------------------------------------------------------
         # Telegram gate preview / policy
         # ---------------------------------------------------------
@@ -2477,8 +2812,14 @@ def main() -> None:
                         print(f"⚠️ Care remix failed: {e}")
                         care2 = care
 
-                x_text2 = build_x_post_text(entry, more_url=more_url, care=care2, custom_x=x_extra)
-                fb_text2 = build_facebook_post_text(entry, care=care2, more_url=more_url, custom_fb=fb_extra)
+                x_text2 = build_x_post_text(
+                    entry, more_url=more_url, care=care2, custom_x=x_extra,
+                    title_line=title_line, details_lines=details_lines,
+                )
+                fb_text2 = build_facebook_post_text(
+                    entry, care=care2, more_url=more_url, custom_fb=fb_extra,
+                    title_line=title_line, details_lines=details_lines,
+                )
 
                 care = care2
                 x_text = x_text2
@@ -2518,8 +2859,7 @@ def main() -> None:
                 if d == "denied":
                     print(f"🛑 Telegram denied for WARNING token={token}. Skipping.")
                     try:
-                        headline = f"{'🟢' if ended else severity_emoji(title_raw)} {_pretty_title_for_social(title_raw)}".strip()
-                        tg_send_message(f"🛑 DENIED — {headline}\nWill NOT post.\nTOKEN: {token}")
+                        tg_send_message(f"🛑 DENIED — {title_line}\nWill NOT post.\nTOKEN: {token}")
                     except Exception:
                         pass
                     continue
@@ -2527,8 +2867,7 @@ def main() -> None:
                 if d == "approved":
                     print(f"✅ Telegram approved for WARNING token={token}. Proceeding to post.")
                     try:
-                        headline = f"{'🟢' if ended else severity_emoji(title_raw)} {_pretty_title_for_social(title_raw)}".strip()
-                        tg_send_message(f"✅ APPROVED — {headline}\nTOKEN: {token}")
+                        tg_send_message(f"✅ APPROVED — {title_line}\nTOKEN: {token}")
                     except Exception:
                         pass
                 else:
@@ -2541,8 +2880,7 @@ def main() -> None:
                     if d2 == "denied":
                         print(f"🛑 Telegram denied during delay window (token={token}). Skipping.")
                         try:
-                            headline = f"{'🟢' if ended else severity_emoji(title_raw)} {_pretty_title_for_social(title_raw)}".strip()
-                            tg_send_message(f"🛑 DENIED — {headline}\nWill NOT post.\nTOKEN: {token}")
+                            tg_send_message(f"🛑 DENIED — {title_line}\nWill NOT post.\nTOKEN: {token}")
                         except Exception:
                             pass
                         continue
@@ -2567,8 +2905,7 @@ def main() -> None:
 
                 print(f"✅ Telegram approved for token={token}. Proceeding to post.")
                 try:
-                    headline = f"{'🟢' if ended else severity_emoji(title_raw)} {_pretty_title_for_social(title_raw)}".strip()
-                    tg_send_message(f"✅ APPROVED — {headline}\nTOKEN: {token}")
+                    tg_send_message(f"✅ APPROVED — {title_line}\nTOKEN: {token}")
                 except Exception:
                     pass
         else:
@@ -2664,14 +3001,15 @@ def main() -> None:
         # Update state
         # ---------------------------------------------------------
         if posted_this:
-            posted.add(guid)
-            posted_text_hashes.add(h)
+            _remember(posted, posted_order, guid)
+            _remember(posted_text_hashes, posted_text_hash_order, h)
 
-            state["posted_guids"] = list(posted)
-            state["posted_text_hashes"] = list(posted_text_hashes)
+            state["posted_guids"] = list(posted_order)
+            state["posted_text_hashes"] = list(posted_text_hash_order)
 
             mark_posted(state, DISPLAY_AREA_NAME, kind=alert_kind)
             save_state(state)
+            dirty = False
 
     # --- Write RSS file at end
     try:
@@ -2680,8 +3018,10 @@ def main() -> None:
     except Exception as e:
         print(f"⚠️ Failed writing RSS to {RSS_PATH}: {e}")
 
-    state["posted_guids"] = list(posted)
-    state["posted_text_hashes"] = list(posted_text_hashes)
+    if dirty:
+        state["posted_guids"] = list(posted_order)
+        state["posted_text_hashes"] = list(posted_text_hash_order)
+    _commit_feed_validators()
     save_state(state)
 
 
@@ -30,14 +30,28 @@
 #
 from __future__ import annotations
 
+import collections
+import functools
 import os
+import random
 import re
 import json
+import threading
 import time
 import datetime as dt
-from typing import Dict, Any, Optional, Callable, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable, Deque, List
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson parses state.json and API responses, and encodes request payloads,
+# several times faster; plain json works the same.
+try:
+    import orjson as _fast_json
+except ImportError:  # pragma: no cover
+    _fast_json = json
 
 # ---------------------------------------------------------------------
 # Config
@@ -45,14 +59,29 @@ import requests
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
 TELEGRAM_CHAT_ID = (os.getenv("TELEGRAM_CHAT_ID", "") or "").strip()
 
+
+def _parse_chat_id(chat_id: str) -> Optional[int]:
+    try:
+        return int(chat_id)
+    except (TypeError, ValueError):
+        return None
+
+
+# Parsed once for _same_chat (None for '@channel' names); refreshed on migration
+_CHAT_ID_INT: Optional[int] = _parse_chat_id(TELEGRAM_CHAT_ID)
+
 TELEGRAM_APPROVAL_TTL_MIN = int(os.getenv("TELEGRAM_APPROVAL_TTL_MIN", "60"))
 TELEGRAM_REMIND_BEFORE_MIN = int(os.getenv("TELEGRAM_REMIND_BEFORE_MIN", "5"))
+# getUpdates long-poll used by wait_for_decision (0 = short polls + sleep)
+TELEGRAM_LONG_POLL_SEC = int(os.getenv("TELEGRAM_LONG_POLL_SEC", "25"))
+# Connect timeout for every Telegram call; read timeouts are set per call
+TELEGRAM_CONNECT_TIMEOUT_SEC = float(os.getenv("TELEGRAM_CONNECT_TIMEOUT_SEC", "10"))
 
 # Optional security hardening:
 # Comma-separated Telegram numeric user IDs allowed to press buttons / send custom text
 # Example: "123456789,987654321"
 _ALLOWED = os.getenv("TELEGRAM_ALLOWED_USER_IDS", "").strip()
-TELEGRAM_ALLOWED_USER_IDS: Optional[set[int]] = None
+TELEGRAM_ALLOWED_USER_IDS: Optional[frozenset[int]] = None
 if _ALLOWED:
     ids: set[int] = set()
     for part in _ALLOWED.split(","):
@@ -63,13 +92,37 @@ if _ALLOWED:
             ids.add(int(part))
         except Exception:
             pass
-    TELEGRAM_ALLOWED_USER_IDS = ids if ids else None
+    TELEGRAM_ALLOWED_USER_IDS = frozenset(ids) if ids else None
+
+
+# One keep-alive session for every Bot API call: the gate wait makes dozens of
+# calls a minute, each of which used to open a fresh TCP+TLS connection.
+# Every call is a POST, which urllib3 never retries once the request was sent,
+# so this only covers failed connects; status retries (429, and 5xx for
+# getUpdates) are done in _tg_request. Sharing it with the _BG_EXECUTOR
+# toast threads is fine: the urllib3 pool is thread-safe, and the Bot API sets
+# no cookies, so the session's own state is never written.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://api.telegram.org",
+    HTTPAdapter(
+        pool_connections=2,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.5, raise_on_status=False),
+    ),
+)
 
 
 # ---------------------------------------------------------------------
 # Small helpers
 # ---------------------------------------------------------------------
+# Shared stand-in for a missing dict in read-only lookups: `(x or _EMPTY).get(...)`
+# instead of allocating a fresh {} per call. Never mutate it.
+_EMPTY: Dict[str, Any] = {}
+
 TOKEN_RE = re.compile(r"^[A-Za-z0-9_-]{4,64}$")
+# Inline button callback_data: "<action>:<token>" (see _inline_keyboard)
+CB_RE = re.compile(r"^(go|no|remix|custom):([A-Za-z0-9_-]{4,64})$")
 
 # Removes redundant EC-style location suffix like "(Tay Township area)"
 _AREA_PAREN_RE = re.compile(r"\s*\(\s*Tay Township area[^)]*\)\s*", flags=re.IGNORECASE)
@@ -79,6 +132,8 @@ _AREA_PAREN_RE = re.compile(r"\s*\(\s*Tay Township area[^)]*\)\s*", flags=re.IGN
 _EC_BOOKMARK_RE = re.compile(
     r"(?im)^[ \t]*Bookmarking your customized list will allow you to access it even if the local storage on your device is erased\.[ \t]*$"
 )
+_MULTI_SPACE_RE = re.compile(r"[ \t]{2,}")
+_MULTI_BLANK_LINES_RE = re.compile(r"\n{3,}")
 
 
 def strip_redundant_area(text: str) -> str:
@@ -98,25 +153,67 @@ def strip_redundant_area(text: str) -> str:
     t = _EC_BOOKMARK_RE.sub("", t)
 
     # 3) collapse repeated spaces/tabs (but do not touch punctuation)
-    t = re.sub(r"[ \t]{2,}", " ", t)
+    t = _MULTI_SPACE_RE.sub(" ", t)
 
     # 4) collapse 3+ blank lines down to 2
-    t = re.sub(r"\n{3,}", "\n\n", t)
+    t = _MULTI_BLANK_LINES_RE.sub("\n\n", t)
 
     return t.strip()
 
 
+# [epoch second, formatted string]; the format has 1 s resolution anyway
+_UTC_NOW_Z_CACHE: List[Any] = [0, ""]
+
+
 def _utc_now_z() -> str:
-    return dt.datetime.utcnow().isoformat(timespec="seconds") + "Z"
+    t = int(time.time())
+    if t != _UTC_NOW_Z_CACHE[0]:
+        _UTC_NOW_Z_CACHE[0] = t
+        _UTC_NOW_Z_CACHE[1] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(t))
+    return _UTC_NOW_Z_CACHE[1]
+
+
+# X counts characters by weight, not code points (twitter-text v3 rules):
+# code points in these ranges count 1, everything else (CJK, emoji...) counts 2,
+# and every URL counts as a 23-character t.co link.
+_TWITTER_LIGHT_RANGES = ((0, 4351), (8192, 8205), (8208, 8223), (8242, 8247))
+_TWITTER_URL_RE = re.compile(r"https?://\S+", re.IGNORECASE)
+TWITTER_URL_LENGTH = 23
+TWITTER_MAX_LENGTH = 280
+
+
+@functools.lru_cache(maxsize=256)
+def twitter_weighted_length(text: str) -> int:
+    """
+    Approximate X length of text. Emoji modifiers/variation selectors add
+    nothing and a ZWJ sequence counts as its first emoji, as on X.
+    """
+    text, n_urls = _TWITTER_URL_RE.subn("", text or "")
+
+    total = n_urls * TWITTER_URL_LENGTH
+    joined = False
+    for ch in text:
+        cp = ord(ch)
+        if cp == 0x200D:  # zero-width joiner: the next code point is part of this emoji
+            joined = True
+            continue
+        if joined:
+            joined = False
+            continue
+        if 0xFE00 <= cp <= 0xFE0F or 0x1F3FB <= cp <= 0x1F3FF:
+            continue
+        total += 1 if any(lo <= cp <= hi for lo, hi in _TWITTER_LIGHT_RANGES) else 2
+    return total
 
 
 def is_twitter_length_valid(text: str) -> bool:
-    return len(text or "") <= 280
+    return twitter_weighted_length(text or "") <= TWITTER_MAX_LENGTH
 
 
 # ---------------------------------------------------------------------
 # Telegram API helpers
 # ---------------------------------------------------------------------
+@functools.lru_cache(maxsize=16)
 def _tg_api(method: str) -> str:
     return f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/{method}"
 
@@ -133,9 +230,8 @@ def _require_config() -> None:
 def _is_allowed_user(from_user_id: Optional[int]) -> bool:
     if TELEGRAM_ALLOWED_USER_IDS is None:
         return True
-    if from_user_id is None:
-        return False
-    return int(from_user_id) in TELEGRAM_ALLOWED_USER_IDS
+    # Telegram user ids arrive as JSON ints; None (or anything else) never matches
+    return from_user_id in TELEGRAM_ALLOWED_USER_IDS
 
 
 def _same_chat(chat_id_any: Any) -> bool:
@@ -148,12 +244,13 @@ def _same_chat(chat_id_any: Any) -> bool:
     """
     if not TELEGRAM_CHAT_ID:
         return False
-    if str(TELEGRAM_CHAT_ID).startswith("@"):
+    if TELEGRAM_CHAT_ID.startswith("@"):
         return True
-    try:
-        return str(int(chat_id_any)) == str(int(TELEGRAM_CHAT_ID))
-    except Exception:
-        return str(chat_id_any) == str(TELEGRAM_CHAT_ID)
+    if _CHAT_ID_INT is not None:
+        if isinstance(chat_id_any, int):
+            return chat_id_any == _CHAT_ID_INT
+        return _parse_chat_id(chat_id_any) == _CHAT_ID_INT
+    return str(chat_id_any) == TELEGRAM_CHAT_ID
 
 
 def _extract_migrate_to_chat_id(resp: requests.Response) -> Optional[str]:
@@ -166,7 +263,7 @@ def _extract_migrate_to_chat_id(resp: requests.Response) -> Optional[str]:
     """
     try:
         j = resp.json()
-        params = (j or {}).get("parameters") or {}
+        params = (j or _EMPTY).get("parameters") or _EMPTY
         mig = params.get("migrate_to_chat_id")
         if mig is None:
             return None
@@ -175,34 +272,131 @@ def _extract_migrate_to_chat_id(resp: requests.Response) -> Optional[str]:
         return None
 
 
+def _extract_retry_after(resp: requests.Response) -> int:
+    """
+    Telegram flood-control error example:
+      429 Too Many Requests: retry after 7
+      parameters: {"retry_after": 7}
+    The Retry-After header wins when present; the JSON body is the fallback.
+    """
+    try:
+        return max(1, int(resp.headers["Retry-After"]))
+    except Exception:
+        pass
+    try:
+        params = (resp.json() or _EMPTY).get("parameters") or _EMPTY
+        return max(1, int(params.get("retry_after", 1)))
+    except Exception:
+        return 1
+
+
+TG_429_MAX_RETRIES = 3
+
+# Safe to repeat after a server error: getUpdates only acknowledges via offset.
+# Sends and edits are not retried on 5xx, so a message is never duplicated.
+_TG_5XX_RETRY_METHODS = frozenset({"getUpdates"})
+_TG_5XX_STATUSES = frozenset({500, 502, 503, 504})
+TG_5XX_MAX_RETRIES = 3
+
+
+# Telegram's global cap is ~30 calls/second; keep the last 30 call times and
+# wait out the window instead of collecting a 429.
+TG_RATE_LIMIT_CALLS = 30
+TG_RATE_LIMIT_WINDOW_SEC = 1.05
+_TG_CALL_TIMES: Deque[float] = collections.deque(maxlen=TG_RATE_LIMIT_CALLS)
+
+# Edits are limited much harder (~1/second per chat); space them per chat_id
+TG_EDIT_MIN_INTERVAL_SEC = 0.8
+_TG_EDIT_METHODS = frozenset({"editMessageText", "editMessageReplyMarkup"})
+_TG_LAST_EDIT_AT: Dict[str, float] = {}
+
+# Callback toasts call in from _BG_EXECUTOR threads. Sleeps happen under the
+# lock, so concurrent callers queue up rather than share one free slot.
+_TG_THROTTLE_LOCK = threading.Lock()
+
+
+def _tg_throttle(method: str, chat_id: Any = None) -> None:
+    with _TG_THROTTLE_LOCK:
+        if len(_TG_CALL_TIMES) == TG_RATE_LIMIT_CALLS:
+            wait = TG_RATE_LIMIT_WINDOW_SEC - (time.monotonic() - _TG_CALL_TIMES[0])
+            if wait > 0:
+                time.sleep(wait)
+        _TG_CALL_TIMES.append(time.monotonic())
+
+        if method in _TG_EDIT_METHODS and chat_id is not None:
+            key = str(chat_id)
+            last = _TG_LAST_EDIT_AT.get(key)
+            if last is not None:
+                wait = TG_EDIT_MIN_INTERVAL_SEC - (time.monotonic() - last)
+                if wait > 0:
+                    time.sleep(wait)
+            _TG_LAST_EDIT_AT[key] = time.monotonic()
+
+
+# requests' json= escapes every emoji to \uXXXX; send compact UTF-8 instead
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _encode_payload(payload: Dict[str, Any]) -> bytes:
+    """Compact UTF-8 JSON body (orjson's default output; json.JSONEncoder otherwise)."""
+    if _fast_json is not json:
+        return _fast_json.dumps(payload)
+    return _JSON_ENCODER.encode(payload).encode("utf-8")
+
+
+def _tg_json(resp: requests.Response) -> Dict[str, Any]:
+    """resp.json(), through orjson when available."""
+    return _fast_json.loads(resp.content)
+
+
 def _tg_request(
     method: str,
     *,
-    json_payload: Optional[Dict[str, Any]] = None,
-    params: Optional[Dict[str, Any]] = None,
+    json_payload: Dict[str, Any],
     timeout: int = 30,
 ) -> requests.Response:
     """
-    Unified Telegram request with auto-migration retry.
-    Retries ONCE if Telegram says the group was upgraded to a supergroup.
+    Unified Telegram request (always a JSON POST) with auto-migration retry.
+    timeout is the read timeout; connecting is capped at TELEGRAM_CONNECT_TIMEOUT_SEC.
+    Retries ONCE if Telegram says the group was upgraded to a supergroup,
+    and up to TG_429_MAX_RETRIES times after a 429, each after the
+    retry_after Telegram asks for (plus jitter). getUpdates is also retried
+    up to TG_5XX_MAX_RETRIES times on 5xx, with backoff.
     """
-    global TELEGRAM_CHAT_ID
+    global TELEGRAM_CHAT_ID, _CHAT_ID_INT
 
     url = _tg_api(method)
+    timeouts = (TELEGRAM_CONNECT_TIMEOUT_SEC, timeout)
 
     def _do() -> requests.Response:
-        if json_payload is not None:
-            return requests.post(url, json=json_payload, timeout=timeout)
-        return requests.get(url, params=params, timeout=timeout)
+        _tg_throttle(method, json_payload.get("chat_id"))
+        body = _encode_payload(json_payload)
+        return _SESSION.post(url, data=body, headers=_JSON_HEADERS, timeout=timeouts)
 
     r = _do()
 
+    # Flood control: wait what Telegram asks (capped, jittered) and try again
+    for _ in range(TG_429_MAX_RETRIES):
+        if r.status_code != 429:
+            break
+        time.sleep(min(_extract_retry_after(r), 30) + random.uniform(0, 0.5))
+        r = _do()
+
+    if method in _TG_5XX_RETRY_METHODS:
+        for attempt in range(TG_5XX_MAX_RETRIES):
+            if r.status_code not in _TG_5XX_STATUSES:
+                break
+            time.sleep(0.5 * (2 ** attempt) + random.uniform(0, 0.5))
+            r = _do()
+
     # Auto-heal: group -> supergroup migration
     if r.status_code == 400:
         mig = _extract_migrate_to_chat_id(r)
         if mig:
             TELEGRAM_CHAT_ID = mig
-            if json_payload is not None and "chat_id" in json_payload:
+            _CHAT_ID_INT = _parse_chat_id(mig)
+            if "chat_id" in json_payload:
                 json_payload["chat_id"] = TELEGRAM_CHAT_ID
             r2 = _do()
             return r2
@@ -238,13 +432,8 @@ def tg_send_message(text: str, reply_markup: Optional[Dict[str, Any]] = None) ->
     # Keep under Telegram's 4096 hard limit with some buffer.
     max_len = 4000
 
-    chunks: List[str] = []
-    while text:
-        chunks.append(text[:max_len])
-        text = text[max_len:]
-
-    if not chunks:
-        chunks = [""]
+    # Index-based slices: the old "text = text[max_len:]" loop re-copied the remainder per chunk
+    chunks = [text[i:i + max_len] for i in range(0, len(text), max_len)] or [""]
 
     last_json: Dict[str, Any] = {"ok": True, "result": None}
 
@@ -261,7 +450,7 @@ def tg_send_message(text: str, reply_markup: Optional[Dict[str, Any]] = None) ->
 
         r = _tg_request("sendMessage", json_payload=payload, timeout=30)
         _raise_tg(r)
-        last_json = r.json()
+        last_json = _tg_json(r)
 
     return last_json
 
@@ -306,7 +495,7 @@ def tg_send_media_group(image_urls: List[str], caption: str = "") -> Dict[str, A
     payload = {"chat_id": TELEGRAM_CHAT_ID, "media": media}
     r = _tg_request("sendMediaGroup", json_payload=payload, timeout=30)
     _raise_tg(r)
-    out = r.json()
+    out = _tg_json(r)
 
     if overflow_text:
         tg_send_message(overflow_text)
@@ -314,7 +503,16 @@ def tg_send_media_group(image_urls: List[str], caption: str = "") -> Dict[str, A
     return out
 
 
-def tg_edit_message_text(chat_id: str, message_id: int, text: str) -> None:
+def tg_edit_message_text(
+    chat_id: str,
+    message_id: int,
+    text: str,
+    reply_markup: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    reply_markup (e.g. _NO_BUTTONS) replaces the buttons in the same call,
+    saving a separate editMessageReplyMarkup.
+    """
     _require_config()
 
     # FINAL SAFETY: sanitize edits too
@@ -326,6 +524,8 @@ def tg_edit_message_text(chat_id: str, message_id: int, text: str) -> None:
         "text": text,
         "disable_web_page_preview": True,
     }
+    if reply_markup is not None:
+        payload["reply_markup"] = reply_markup
     r = _tg_request("editMessageText", json_payload=payload, timeout=30)
     _raise_tg(r)
 
@@ -335,7 +535,7 @@ def tg_edit_message_reply_markup(chat_id: str, message_id: int, reply_markup: Op
     payload: Dict[str, Any] = {
         "chat_id": chat_id,
         "message_id": message_id,
-        "reply_markup": reply_markup if reply_markup is not None else {"inline_keyboard": []},
+        "reply_markup": reply_markup if reply_markup is not None else _NO_BUTTONS,
     }
     r = _tg_request("editMessageReplyMarkup", json_payload=payload, timeout=30)
     _raise_tg(r)
@@ -359,13 +559,18 @@ def tg_answer_callback_query(callback_query_id: str, text: str = "", show_alert:
         return
     # Telegram can return 200 with ok=false for some errors; keep it soft
     try:
-        j = r.json()
+        j = _tg_json(r)
         if not j.get("ok"):
             return
     except Exception:
         return
 
 
+# Background Telegram calls whose result nobody waits on (callback toasts).
+# Worker threads are joined at interpreter exit, so queued toasts still go out.
+_BG_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tg-bg")
+
+
 def tg_answer_callback_query_safe(callback_query_id: str, text: str = "") -> None:
     try:
         if not _config_ok():
@@ -375,31 +580,67 @@ def tg_answer_callback_query_safe(callback_query_id: str, text: str = "") -> Non
         pass
 
 
-def tg_get_updates(offset: Optional[int]) -> Dict[str, Any]:
+# Only button presses and chat messages are handled; Telegram drops the rest
+# (edits, channel posts, member changes...) server-side.
+_ALLOWED_UPDATES = ["callback_query", "message"]
+
+
+def tg_get_updates(offset: Optional[int], long_poll: int = 0, limit: int = 50) -> Dict[str, Any]:
+    """
+    long_poll > 0 makes Telegram hold the request open (up to that many seconds)
+    until an update arrives, instead of returning immediately.
+    limit caps the batch (Telegram allows 1-100); the rest comes on the next call.
+    """
     _require_config()
-    params: Dict[str, Any] = {"timeout": 0}
+    long_poll = max(0, int(long_poll))
+    payload: Dict[str, Any] = {
+        "timeout": long_poll,
+        "allowed_updates": _ALLOWED_UPDATES,
+        "limit": max(1, min(100, int(limit))),
+    }
     if offset is not None:
-        params["offset"] = offset
-    r = _tg_request("getUpdates", params=params, timeout=30)
+        payload["offset"] = offset
+    # Telegram answers by long_poll seconds; the margin covers a slow reply
+    r = _tg_request("getUpdates", json_payload=payload, timeout=long_poll + 10)
     _raise_tg(r)
-    return r.json()
+    return _tg_json(r)
 
 
 # ---------------------------------------------------------------------
 # State helpers
 # ---------------------------------------------------------------------
+_STATE_DEFAULT_KEYS = frozenset({
+    "pending_approvals",
+    "approval_decisions",
+    "telegram_last_update_id",
+    "telegram_remix_count",
+    "telegram_custom_pending",
+    "telegram_custom_text",
+    "telegram_last_reminder_at",
+})
+
+
 def _ensure_state_defaults(state: Dict[str, Any]) -> None:
+    # Fast path: after the first call on a state every key is already there
+    if state.keys() >= _STATE_DEFAULT_KEYS:
+        return
     state.setdefault("pending_approvals", {})          # token -> record
     state.setdefault("approval_decisions", {})         # token -> {decision, decided_at, ...}
     state.setdefault("telegram_last_update_id", 0)
     state.setdefault("telegram_remix_count", {})       # token -> int
     state.setdefault("telegram_custom_pending", None)  # {token, mode, created_at}
-    state.setdefault("telegram_custom_text", {})       # token -> {"x": str|None, "fb": str|None}
-    state.setdefault("telegram_last_reminder_at", {})  # token -> iso time (avoid spam)
+    state.setdefault("telegram_custom_text", {})       # token -> [x: str|None, fb: str|None]
     state.setdefault("telegram_last_reminder_at", {})  # token -> iso time (avoid spam)
 
 
+# Markup that removes a message's buttons. Shared, never mutated: payloads only
+# reference it and requests serializes it.
+_NO_BUTTONS: Dict[str, Any] = {"inline_keyboard": []}
+
+
+@functools.lru_cache(maxsize=32)
 def _inline_keyboard(token: str) -> Dict[str, Any]:
+    """Approve/Deny/Remix/Custom keyboard for token (cached; callers must not mutate it)."""
     return {
         "inline_keyboard": [
             [
@@ -415,12 +656,12 @@ def _inline_keyboard(token: str) -> Dict[str, Any]:
 
 
 def _disable_buttons(state: Dict[str, Any], token: str) -> None:
-    rec = (state.get("pending_approvals") or {}).get(token) or {}
+    rec = (state.get("pending_approvals") or _EMPTY).get(token) or _EMPTY
     chat_id = rec.get("buttons_chat_id")
     msg_id = rec.get("buttons_message_id")
     if chat_id and msg_id:
         try:
-            tg_edit_message_reply_markup(str(chat_id), int(msg_id), {"inline_keyboard": []})
+            tg_edit_message_reply_markup(str(chat_id), int(msg_id), _NO_BUTTONS)
         except Exception:
             pass
 
@@ -435,14 +676,15 @@ def _confirm_action(
 ) -> None:
     """
     Reliable confirmation strategy:
-      1) answerCallbackQuery (toast) if we have cb_id
+      1) answerCallbackQuery (toast) if we have cb_id, in the background
       2) Try to edit the buttons message text + remove buttons
-      3) If edit fails, send a new message fallback
+      3) If edit fails, still try to remove the buttons, and send a new message fallback
     """
     if cb_id:
-        tg_answer_callback_query_safe(cb_id, text=toast)
+        # The toast doesn't depend on the edit below; let the two overlap.
+        _BG_EXECUTOR.submit(tg_answer_callback_query_safe, cb_id, toast)
 
-    rec = (state.get("pending_approvals") or {}).get(token) or {}
+    rec = (state.get("pending_approvals") or _EMPTY).get(token) or _EMPTY
     chat_id = rec.get("buttons_chat_id") or TELEGRAM_CHAT_ID
     msg_id = rec.get("buttons_message_id")
 
@@ -451,14 +693,16 @@ def _confirm_action(
     edited_ok = False
     if chat_id and msg_id:
         try:
-            tg_edit_message_text(str(chat_id), int(msg_id), new_text)
-            try:
-                tg_edit_message_reply_markup(str(chat_id), int(msg_id), {"inline_keyboard": []})
-            except Exception:
-                pass
+            # New text and button removal in one editMessageText call
+            tg_edit_message_text(str(chat_id), int(msg_id), new_text, reply_markup=_NO_BUTTONS)
             edited_ok = True
         except Exception:
             edited_ok = False
+            # Text edit rejected; at least take the stale buttons away
+            try:
+                tg_edit_message_reply_markup(str(chat_id), int(msg_id), _NO_BUTTONS)
+            except Exception:
+                pass
 
     if not edited_ok:
         # Fallback: always send a standalone confirmation message
@@ -471,25 +715,29 @@ def _confirm_action(
 # ---------------------------------------------------------------------
 # Decision + flags helpers (used by main script)
 # ---------------------------------------------------------------------
+# The read-only getters below are called every poll; they look keys up
+# directly and treat a missing/malformed entry as "nothing recorded" instead
+# of running _ensure_state_defaults (every writer in this module does that).
 def decision_for(state: Dict[str, Any], token: str) -> Optional[str]:
-    _ensure_state_defaults(state)
-    rec = (state.get("approval_decisions") or {}).get(token) or {}
-    d = (rec.get("decision") or "").strip().lower()
-    if d in ("approved", "denied"):
-        return d
-    return None
+    try:
+        d = state["approval_decisions"][token]["decision"].strip().lower()
+    except (KeyError, TypeError, AttributeError):
+        return None
+    return d if d in ("approved", "denied") else None
 
 
 def is_pending(state: Dict[str, Any], token: str) -> bool:
-    _ensure_state_defaults(state)
-    token = (token or "").strip()
-    return token in (state.get("pending_approvals") or {})
+    try:
+        return (token or "").strip() in state["pending_approvals"]
+    except (KeyError, TypeError):
+        return False
 
 
 def is_expired(state: Dict[str, Any], token: str, ttl_min: Optional[int] = None) -> bool:
     """
     Returns True if the pending approval token is older than ttl_min minutes.
-    Uses pending_approvals[token]["created_at"] (ISO string with trailing Z).
+    Uses pending_approvals[token]["created_at_ts"] (epoch seconds), or
+    "created_at" (ISO string with trailing Z) for records written before it.
     If created_at is missing or unparseable, returns False (fail-open on expiry check).
     """
     _ensure_state_defaults(state)
@@ -500,40 +748,124 @@ def is_expired(state: Dict[str, Any], token: str, ttl_min: Optional[int] = None)
     if ttl_min is None:
         ttl_min = TELEGRAM_APPROVAL_TTL_MIN
 
-    rec = (state.get("pending_approvals") or {}).get(token) or {}
-    created_at = (rec.get("created_at") or "").strip()
-    if not created_at:
+    rec = (state.get("pending_approvals") or _EMPTY).get(token) or _EMPTY
+
+    # Epoch seconds written alongside created_at; no ISO parsing needed.
+    created_ts = rec.get("created_at_ts")
+    if isinstance(created_ts, (int, float)):
+        return (time.time() - created_ts) >= float(ttl_min) * 60.0
+
+    created_dt = _pending_created_dt(rec)
+    if created_dt is None:
         return False
+    age_sec = (dt.datetime.now(dt.timezone.utc) - created_dt).total_seconds()
+    return age_sec >= float(ttl_min) * 60.0
+
+
+def _parse_utc_z(s: str) -> dt.datetime:
+    """
+    Parses timestamps as written by _utc_now_z ("2026-01-03T17:08:00Z") by
+    slicing, without the full ISO grammar; anything else goes through
+    fromisoformat. Raises ValueError if neither works.
+    """
+    if len(s) == 20 and s[10] == "T" and s[19] == "Z":
+        return dt.datetime(
+            int(s[0:4]), int(s[5:7]), int(s[8:10]),
+            int(s[11:13]), int(s[14:16]), int(s[17:19]),
+            tzinfo=dt.timezone.utc,
+        )
+    return dt.datetime.fromisoformat(s.replace("Z", "+00:00"))
+
 
+def _pending_created_dt(rec: Dict[str, Any]) -> Optional[dt.datetime]:
+    """When a pending_approvals record was created (UTC), or None if unknown."""
+    created_ts = rec.get("created_at_ts")
+    if isinstance(created_ts, (int, float)):
+        return dt.datetime.fromtimestamp(created_ts, dt.timezone.utc)
+
+    created_at = (rec.get("created_at") or "").strip()
+    if not created_at:
+        return None
     try:
-        created_dt = dt.datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-        if created_dt.tzinfo is None:
-            created_dt = created_dt.replace(tzinfo=dt.timezone.utc)
-        now = dt.datetime.now(dt.timezone.utc)
-        age_sec = (now - created_dt).total_seconds()
-        return age_sec >= float(ttl_min) * 60.0
+        created_dt = _parse_utc_z(created_at)
     except Exception:
-        return False
+        return None
+    if created_dt.tzinfo is None:
+        created_dt = created_dt.replace(tzinfo=dt.timezone.utc)
+    return created_dt
 
 
 def remix_count_for(state: Dict[str, Any], token: str) -> int:
-    _ensure_state_defaults(state)
-    return int((state.get("telegram_remix_count") or {}).get(token) or 0)
+    try:
+        return int(state["telegram_remix_count"][token] or 0)
+    except (KeyError, TypeError):
+        return 0
 
 
 def custom_text_for(state: Dict[str, Any], token: str) -> Dict[str, Optional[str]]:
-    _ensure_state_defaults(state)
-    return (state.get("telegram_custom_text") or {}).get(token) or {"x": None, "fb": None}
+    try:
+        v = state["telegram_custom_text"][token]
+    except (KeyError, TypeError):
+        return {"x": None, "fb": None}
+    if isinstance(v, list) and len(v) == 2:
+        return {"x": v[0], "fb": v[1]}
+    if isinstance(v, dict):  # written before the [x, fb] layout
+        return {"x": v.get("x"), "fb": v.get("fb")}
+    return {"x": None, "fb": None}
+
+
+def _custom_text_slot(state: Dict[str, Any], token: str) -> List[Optional[str]]:
+    """
+    The stored [x, fb] custom text pair for token, created if missing.
+    Stored as a 2-item list rather than {"x":..., "fb":...} to keep state.json small;
+    old dict entries are converted on first write.
+    """
+    store = state.setdefault("telegram_custom_text", {})
+    v = store.get(token)
+    if isinstance(v, dict):
+        v = [v.get("x"), v.get("fb")]
+    elif not (isinstance(v, list) and len(v) == 2):
+        v = [None, None]
+    store[token] = v
+    return v
 
 
 def clear_custom_text(state: Dict[str, Any], token: str) -> None:
     _ensure_state_defaults(state)
-    (state.get("telegram_custom_text") or {}).pop(token, None)
+    custom = state.get("telegram_custom_text")
+    if custom:
+        custom.pop(token, None)
     pc = state.get("telegram_custom_pending")
     if pc and pc.get("token") == token:
         state["telegram_custom_pending"] = None
 
 
+# Decisions older than the newest MAX_APPROVAL_DECISIONS are dropped on write.
+MAX_APPROVAL_DECISIONS = 500
+
+
+def _prune_decision_history(state: Dict[str, Any]) -> None:
+    """
+    Keeps approval_decisions to the newest MAX_APPROVAL_DECISIONS (by decided_at),
+    and drops remix counts / reminder times for tokens that are neither pending
+    nor among the kept decisions. Called after each decision is recorded.
+    """
+    decisions = state["approval_decisions"]
+    if len(decisions) > MAX_APPROVAL_DECISIONS:
+        newest = sorted(
+            decisions.items(),
+            key=lambda kv: (kv[1] or _EMPTY).get("decided_at") or "",
+            reverse=True,
+        )[:MAX_APPROVAL_DECISIONS]
+        state["approval_decisions"] = decisions = dict(newest)
+
+    live = state["pending_approvals"].keys() | decisions.keys()
+    for key in ("telegram_remix_count", "telegram_last_reminder_at"):
+        per_token = state[key]
+        if not per_token.keys() <= live:
+            state[key] = {t: v for t, v in per_token.items() if t in live}
+
+
 def mark_denied(state: Dict[str, Any], token: str, reason: str = "expired") -> None:
     _ensure_state_defaults(state)
     state["approval_decisions"][token] = {
@@ -542,14 +874,112 @@ def mark_denied(state: Dict[str, Any], token: str, reason: str = "expired") -> N
         "reason": reason,
     }
     state["pending_approvals"].pop(token, None)
+    _prune_decision_history(state)
+
+
+# ---------------------------------------------------------------------
+# Button handlers (dispatched from ingest_telegram_actions via CB_RE)
+# ---------------------------------------------------------------------
+def _on_approve(state: Dict[str, Any], token: str, cb_id: str, notices: List[str]) -> None:
+    state["approval_decisions"][token] = {"decision": "approved", "decided_at": _utc_now_z()}
+    _confirm_action(
+        state=state,
+        token=token,
+        line="✅ Approved — will post.",
+        cb_id=cb_id,
+        toast="Approved ✅",
+    )
+    state["pending_approvals"].pop(token, None)
+    _prune_decision_history(state)
+
+
+def _on_deny(state: Dict[str, Any], token: str, cb_id: str, notices: List[str]) -> None:
+    state["approval_decisions"][token] = {"decision": "denied", "decided_at": _utc_now_z()}
+    _confirm_action(
+        state=state,
+        token=token,
+        line="🛑 Denied — will NOT post.",
+        cb_id=cb_id,
+        toast="Denied 🛑",
+    )
+    state["pending_approvals"].pop(token, None)
+    _prune_decision_history(state)
+
+
+def _on_remix(state: Dict[str, Any], token: str, cb_id: str, notices: List[str]) -> None:
+    state["telegram_remix_count"][token] = remix_count_for(state, token) + 1
+    _confirm_action(
+        state=state,
+        token=token,
+        line="🔁 Remix requested — regenerating preview.",
+        cb_id=cb_id,
+        toast="Remixing 🔁",
+    )
+
+
+def _on_custom(state: Dict[str, Any], token: str, cb_id: str, notices: List[str]) -> None:
+    state["telegram_custom_pending"] = {"token": token, "mode": "x", "created_at": _utc_now_z()}
+    _confirm_action(
+        state=state,
+        token=token,
+        line="✏️ Custom text mode enabled — send X text in chat.",
+        cb_id=cb_id,
+        toast="Custom ✏️",
+    )
+    notices.append(
+        "✏️ Custom Text:\n"
+        "Send the text for the X post.\n\n"
+        "Commands:\n"
+        "  /skip  (skip X, enter FB)\n"
+        "  /done  (cancel)"
+    )
+
+
+_CALLBACK_HANDLERS: Dict[str, Callable[[Dict[str, Any], str, str, List[str]], None]] = {
+    "go": _on_approve,
+    "no": _on_deny,
+    "remix": _on_remix,
+    "custom": _on_custom,
+}
+
+
+# Custom-text chat commands; each returns False if it doesn't apply in this mode
+# (the message is then treated as custom text).
+def _cmd_done(state: Dict[str, Any], mode: str, notices: List[str]) -> bool:
+    state["telegram_custom_pending"] = None
+    notices.append("✅ Custom text cancelled.")
+    return True
+
+
+def _cmd_skip(state: Dict[str, Any], mode: str, notices: List[str]) -> bool:
+    if mode == "x":
+        state["telegram_custom_pending"]["mode"] = "fb"
+        notices.append("Skipped X. Please send the Facebook custom text (or /done):")
+        return True
+    if mode == "fb":
+        state["telegram_custom_pending"] = None
+        notices.append("✅ Facebook left as default. I’ll send a new preview.")
+        return True
+    return False
+
+
+_CUSTOM_COMMANDS: Dict[str, Callable[[Dict[str, Any], str, List[str]], bool]] = {
+    "/done": _cmd_done,
+    "/skip": _cmd_skip,
+}
 
 
 # ---------------------------------------------------------------------
 # Main ingest loop
 # ---------------------------------------------------------------------
-def ingest_telegram_actions(state: Dict[str, Any], save_fn: Callable[[Dict[str, Any]], None]) -> None:
+def ingest_telegram_actions(
+    state: Dict[str, Any],
+    save_fn: Callable[[Dict[str, Any]], None],
+    long_poll: int = 0,
+) -> None:
     """
     Pulls getUpdates, records button clicks and custom text into state.json.
+    long_poll is passed to getUpdates (see tg_get_updates).
 
     SECURITY:
     - Ignores updates not from TELEGRAM_CHAT_ID (where enforceable)
@@ -566,200 +996,120 @@ def ingest_telegram_actions(state: Dict[str, Any], save_fn: Callable[[Dict[str,
     _ensure_state_defaults(state)
 
     last_id = int(state.get("telegram_last_update_id", 0) or 0)
-    data = tg_get_updates(last_id + 1 if last_id else None)
+    data = tg_get_updates(last_id + 1 if last_id else None, long_poll=long_poll)
     if not data.get("ok"):
         return
 
     changed = False
+    # Chat replies for this batch go out as one message after the loop
+    notices: List[str] = []
 
-    for upd in data.get("result", []):
-        uid = upd.get("update_id")
-        if isinstance(uid, int):
-            state["telegram_last_update_id"] = uid
-            changed = True
-
-        # 1) BUTTON CLICKS
-        cb = upd.get("callback_query")
-        if cb:
-            cb_id = (cb.get("id") or "").strip()
-            cb_data = (cb.get("data") or "").strip()
-
-            from_user_id = (cb.get("from") or {}).get("id")
-            msg = cb.get("message") or {}
-            chat_id = (msg.get("chat") or {}).get("id")
-
-            # enforce chat (when possible)
-            if chat_id is not None and not _same_chat(chat_id):
-                tg_answer_callback_query_safe(cb_id, text="Wrong chat.")
-                continue
+    # Persist once per batch, even if a handler raises part-way, so the
+    # offset and the updates already applied aren't replayed next run
+    try:
+        for upd in data.get("result", []):
+            uid = upd.get("update_id")
+            if isinstance(uid, int):
+                state["telegram_last_update_id"] = uid
+                changed = True
 
-            # enforce allow-list (optional)
-            if not _is_allowed_user(from_user_id):
-                tg_answer_callback_query_safe(cb_id, text="Not authorised.")
+            # 1) BUTTON CLICKS
+            cb = upd.get("callback_query")
+            if cb:
+                cb_id = (cb.get("id") or "").strip()
+                cb_data = (cb.get("data") or "").strip()
+
+                from_user_id = (cb.get("from") or _EMPTY).get("id")
+                msg = cb.get("message") or _EMPTY
+                chat_id = (msg.get("chat") or _EMPTY).get("id")
+
+                # enforce chat (when possible)
+                if chat_id is not None and not _same_chat(chat_id):
+                    tg_answer_callback_query_safe(cb_id, text="Wrong chat.")
+                    continue
+
+                # enforce allow-list (optional)
+                if not _is_allowed_user(from_user_id):
+                    tg_answer_callback_query_safe(cb_id, text="Not authorised.")
+                    continue
+
+                m = CB_RE.match(cb_data)
+                if not m:
+                    tg_answer_callback_query_safe(cb_id, text="Invalid action.")
+                    continue
+                action, token = m.groups()
+
+                # If token not pending anymore, still ACK so Telegram UI doesn’t feel broken
+                if token not in (state.get("pending_approvals") or _EMPTY) and action in ("go", "no"):
+                    tg_answer_callback_query_safe(cb_id, text="Already decided.")
+                    continue
+
+                _CALLBACK_HANDLERS[action](state, token, cb_id, notices)
+                changed = True
                 continue
 
-            if ":" not in cb_data:
-                tg_answer_callback_query_safe(cb_id, text="Invalid action.")
+            # 2) CUSTOM TEXT CHAT INPUT
+            msg = upd.get("message") or _EMPTY
+            text = (msg.get("text") or "").strip()
+            if not text:
                 continue
 
-            action, token = cb_data.split(":", 1)
-            action = action.strip().lower()
-            token = token.strip()
+            from_user_id = (msg.get("from") or _EMPTY).get("id")
+            chat_id = (msg.get("chat") or _EMPTY).get("id")
 
-            if not TOKEN_RE.match(token):
-                tg_answer_callback_query_safe(cb_id, text="Invalid token.")
+            if chat_id is not None and not _same_chat(chat_id):
                 continue
-
-            # If token not pending anymore, still ACK so Telegram UI doesn’t feel broken
-            if token not in (state.get("pending_approvals") or {}) and action in ("go", "no"):
-                tg_answer_callback_query_safe(cb_id, text="Already decided.")
+            if not _is_allowed_user(from_user_id):
                 continue
 
-            if action == "go":
-                state["approval_decisions"][token] = {"decision": "approved", "decided_at": _utc_now_z()}
-                _confirm_action(
-                    state=state,
-                    token=token,
-                    line="✅ Approved — will post.",
-                    cb_id=cb_id,
-                    toast="Approved ✅",
-                )
-                state["pending_approvals"].pop(token, None)
-                changed = True
+            pending_custom = state.get("telegram_custom_pending")
+            if not pending_custom:
+                continue
 
-            elif action == "no":
-                state["approval_decisions"][token] = {"decision": "denied", "decided_at": _utc_now_z()}
-                _confirm_action(
-                    state=state,
-                    token=token,
-                    line="🛑 Denied — will NOT post.",
-                    cb_id=cb_id,
-                    toast="Denied 🛑",
-                )
-                state["pending_approvals"].pop(token, None)
-                changed = True
+            token_p = (pending_custom.get("token") or "").strip()
+            mode = (pending_custom.get("mode") or "x").lower().strip()
 
-            elif action == "remix":
-                state["telegram_remix_count"][token] = remix_count_for(state, token) + 1
-                _confirm_action(
-                    state=state,
-                    token=token,
-                    line="🔁 Remix requested — regenerating preview.",
-                    cb_id=cb_id,
-                    toast="Remixing 🔁",
-                )
+            if not TOKEN_RE.match(token_p):
+                state["telegram_custom_pending"] = None
                 changed = True
+                continue
 
-            elif action == "custom":
-                state["telegram_custom_pending"] = {"token": token, "mode": "x", "created_at": _utc_now_z()}
-                _confirm_action(
-                    state=state,
-                    token=token,
-                    line="✏️ Custom text mode enabled — send X text in chat.",
-                    cb_id=cb_id,
-                    toast="Custom ✏️",
-                )
-                try:
-                    tg_send_message(
-                        "✏️ Custom Text:\n"
-                        "Send the text for the X post.\n\n"
-                        "Commands:\n"
-                        "  /skip  (skip X, enter FB)\n"
-                        "  /done  (cancel)\n"
-                    )
-                except Exception:
-                    pass
+            command = _CUSTOM_COMMANDS.get(text.lower())
+            if command is not None and command(state, mode, notices):
                 changed = True
+                continue
 
-            else:
-                tg_answer_callback_query_safe(cb_id, text="Unknown action.")
-            continue
-
-        # 2) CUSTOM TEXT CHAT INPUT
-        msg = upd.get("message") or {}
-        text = (msg.get("text") or "").strip()
-        if not text:
-            continue
-
-        from_user_id = (msg.get("from") or {}).get("id")
-        chat_id = (msg.get("chat") or {}).get("id")
-
-        if chat_id is not None and not _same_chat(chat_id):
-            continue
-        if not _is_allowed_user(from_user_id):
-            continue
-
-        pending_custom = state.get("telegram_custom_pending")
-        if not pending_custom:
-            continue
-
-        token_p = (pending_custom.get("token") or "").strip()
-        mode = (pending_custom.get("mode") or "x").lower().strip()
-
-        if not TOKEN_RE.match(token_p):
-            state["telegram_custom_pending"] = None
-            changed = True
-            continue
-
-        if text.lower() == "/done":
-            state["telegram_custom_pending"] = None
-            try:
-                tg_send_message("✅ Custom text cancelled.")
-            except Exception:
-                pass
-            changed = True
-            continue
-
-        if text.lower() == "/skip" and mode == "x":
-            state["telegram_custom_pending"]["mode"] = "fb"
-            try:
-                tg_send_message("Skipped X. Please send the Facebook custom text (or /done):")
-            except Exception:
-                pass
-            changed = True
-            continue
-
-        if text.lower() == "/skip" and mode == "fb":
-            state["telegram_custom_pending"] = None
-            try:
-                tg_send_message("✅ Facebook left as default. I’ll send a new preview.")
-            except Exception:
-                pass
-            changed = True
-            continue
-
-        state.setdefault("telegram_custom_text", {}).setdefault(token_p, {"x": None, "fb": None})
+            custom_slot = _custom_text_slot(state, token_p)
 
-        if mode == "x":
-            if is_twitter_length_valid(text):
-                # Keep sanitization minimal and consistent
-                state["telegram_custom_text"][token_p]["x"] = strip_redundant_area(text)
-                state["telegram_custom_pending"]["mode"] = "fb"
-                try:
-                    tg_send_message(
+            if mode == "x":
+                if is_twitter_length_valid(text):
+                    # Keep sanitization minimal and consistent
+                    custom_slot[0] = strip_redundant_area(text)
+                    state["telegram_custom_pending"]["mode"] = "fb"
+                    notices.append(
                         "✅ X text saved. Now send Facebook text "
                         "(or /skip to keep default FB /done to cancel):"
                     )
-                except Exception:
-                    pass
-            else:
-                try:
-                    tg_send_message(f"⚠️ Too long for X ({len(text)}/280). Try again, or /skip:")
-                except Exception:
-                    pass
-            changed = True
+                else:
+                    notices.append(
+                        f"⚠️ Too long for X ({twitter_weighted_length(text)}/{TWITTER_MAX_LENGTH}). Try again, or /skip:"
+                    )
+                changed = True
 
-        elif mode == "fb":
-            state["telegram_custom_text"][token_p]["fb"] = strip_redundant_area(text)
-            state["telegram_custom_pending"] = None
-            try:
-                tg_send_message("✅ Facebook text saved. I’ll send a new preview.")
-            except Exception:
-                pass
-            changed = True
+            elif mode == "fb":
+                custom_slot[1] = strip_redundant_area(text)
+                state["telegram_custom_pending"] = None
+                notices.append("✅ Facebook text saved. I’ll send a new preview.")
+                changed = True
+    finally:
+        if changed:
+            save_fn(state)
 
-    if changed:
-        save_fn(state)
+    if notices:
+        try:
+            tg_send_message("\n\n".join(notices))
+        except Exception:
+            pass
 
 
 # ---------------------------------------------------------------------
@@ -786,7 +1136,7 @@ def ensure_preview_sent(
         raise ValueError("Invalid token format")
 
     # If we already have pending or decided, do not re-send initial gate
-    if token in (state.get("pending_approvals") or {}) or token in (state.get("approval_decisions") or {}):
+    if token in (state.get("pending_approvals") or _EMPTY) or token in (state.get("approval_decisions") or _EMPTY):
         return
 
     cleaned_preview = strip_redundant_area(preview_text)
@@ -794,10 +1144,11 @@ def ensure_preview_sent(
     _send_preview_payload(cleaned_preview, image_urls)
 
     sent = tg_send_message(f"TOKEN: {token}\nSelect an action:", reply_markup=_inline_keyboard(token))
-    msg_id = int((sent.get("result") or {}).get("message_id") or 0)
+    msg_id = int((sent.get("result") or _EMPTY).get("message_id") or 0)
 
     state.setdefault("pending_approvals", {})[token] = {
         "created_at": _utc_now_z(),
+        "created_at_ts": int(time.time()),
         "preview_text": cleaned_preview,
         "kind": kind,
         "buttons_message_id": msg_id,
@@ -824,8 +1175,8 @@ def update_preview(
     if not TOKEN_RE.match(token):
         return
 
-    pending = state.get("pending_approvals") or {}
-    if token not in pending:
+    pending = state.get("pending_approvals") or _EMPTY
+    if token not in pending:  # never true for _EMPTY, so it is never written below
         return
 
     cleaned_preview = strip_redundant_area(new_preview_text)
@@ -862,6 +1213,41 @@ def _send_preview_payload(preview_text: str, image_urls: Optional[List[str]]) ->
 # ---------------------------------------------------------------------
 # Gate wait helper (MAIN SCRIPT MUST CALL THIS)
 # ---------------------------------------------------------------------
+# path -> (st_mtime_ns, st_size, raw file bytes)
+_STATE_FILE_CACHE: Dict[str, tuple] = {}
+
+# Shortest sleep between wait_for_decision polls; poll_seconds is the longest
+WAIT_POLL_MIN_SEC = 0.5
+
+
+def _state_file_mtime(state_path: str) -> Optional[int]:
+    try:
+        return os.stat(state_path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _load_state_file(state_path: str) -> Dict[str, Any]:
+    """
+    Parsed JSON at state_path, re-read only when its mtime/size change.
+    While waiting the file rarely changes, so most polls are a stat() and a
+    parse of the cached bytes. Each call returns a fresh dict: callers change
+    it in place, and a failed or skipped save must not leak into the next poll.
+    """
+    try:
+        st = os.stat(state_path)
+        cached = _STATE_FILE_CACHE.get(state_path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            raw = cached[2]
+        else:
+            with open(state_path, "rb") as f:
+                raw = f.read()
+            _STATE_FILE_CACHE[state_path] = (st.st_mtime_ns, st.st_size, raw)
+        return _fast_json.loads(raw) or {}
+    except Exception:
+        return {}
+
+
 def wait_for_decision(
     st: Dict[str, Any],
     token: str,
@@ -873,6 +1259,7 @@ def wait_for_decision(
     load_state_fn: Optional[Callable[[], Dict[str, Any]]] = None,  # BEST: reload from disk each poll
     state_path: Optional[str] = None,              # alternative: reload from JSON path each poll
     ingest_each_poll: bool = True,                 # BEST PRACTICE: process button clicks during wait
+    long_poll_seconds: Optional[int] = None,       # >0: getUpdates long-poll replaces the sleep
     **kwargs,                                      # swallow unexpected args safely
 ) -> str:
     """
@@ -882,9 +1269,14 @@ def wait_for_decision(
     - To reliably see Deny/Approve while waiting, this function will (by default)
       ingest Telegram updates each poll IF save_state_fn is provided.
     - Provide either load_state_fn OR state_path so state is reloaded each poll.
+    - With long_poll_seconds (default TELEGRAM_LONG_POLL_SEC), each ingest
+      blocks in getUpdates until a click arrives (or the long-poll times
+      out), so no extra sleep is needed.
     """
     if poll_interval_seconds is not None:
         poll_seconds = int(poll_interval_seconds)
+    if long_poll_seconds is None:
+        long_poll_seconds = TELEGRAM_LONG_POLL_SEC
 
     token = (token or "").strip()
     if not TOKEN_RE.match(token):
@@ -897,28 +1289,18 @@ def wait_for_decision(
             except Exception:
                 return {}
         if state_path:
-            try:
-                with open(state_path, "r", encoding="utf-8") as f:
-                    return json.load(f) or {}
-            except Exception:
-                return {}
+            return _load_state_file(state_path)
         return st if isinstance(st, dict) else {}
 
     st_local = _reload()
     _ensure_state_defaults(st_local)
 
-    pending = (st_local.get("pending_approvals") or {}).get(token)
+    pending = (st_local.get("pending_approvals") or _EMPTY).get(token)
     if not pending:
         d = decision_for(st_local, token)
         return d if d in ("approved", "denied") else "denied"
 
-    created_at = (pending.get("created_at") or "").strip()
-    try:
-        created_dt = dt.datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-        if created_dt.tzinfo is None:
-            created_dt = created_dt.replace(tzinfo=dt.timezone.utc)
-    except Exception:
-        created_dt = dt.datetime.now(dt.timezone.utc)
+    created_dt = _pending_created_dt(pending) or dt.datetime.now(dt.timezone.utc)
 
     hard_deadline = created_dt + dt.timedelta(minutes=int(ttl_min))
 
@@ -926,12 +1308,25 @@ def wait_for_decision(
     if max_wait_seconds is not None:
         soft_deadline = dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=int(max_wait_seconds))
 
+    # Between polls: start short, back off x1.6 up to poll_seconds while nothing
+    # changes, and drop back to the minimum whenever state.json is rewritten.
+    sleep_s = WAIT_POLL_MIN_SEC
+    last_mtime: Optional[int] = None
+
+    deadline = min(hard_deadline, soft_deadline) if soft_deadline else hard_deadline
+
     while True:
-        # Process new Telegram updates while waiting (ensures Deny prevents posting)
+        # Process new Telegram updates while waiting (ensures Deny prevents posting).
+        # The long-poll never runs past the deadline, so expiry isn't overshot by up to
+        # a full long-poll.
+        long_polled = False
         if ingest_each_poll and save_state_fn is not None:
             try:
+                remaining = (deadline - dt.datetime.now(dt.timezone.utc)).total_seconds()
+                poll_for = max(0, min(int(long_poll_seconds), int(remaining)))
                 tmp = _reload()
-                ingest_telegram_actions(tmp, save_state_fn)
+                ingest_telegram_actions(tmp, save_state_fn, long_poll=poll_for)
+                long_polled = poll_for > 0 and _config_ok()
             except Exception:
                 pass
 
@@ -943,7 +1338,7 @@ def wait_for_decision(
             return d
 
         # If it disappeared, treat as denied (safe)
-        pending = (st_local.get("pending_approvals") or {}).get(token)
+        pending = (st_local.get("pending_approvals") or _EMPTY).get(token)
         if not pending:
             d2 = decision_for(st_local, token)
             return d2 if d2 in ("approved", "denied") else "denied"
@@ -962,7 +1357,14 @@ def wait_for_decision(
         if soft_deadline and now >= soft_deadline:
             return "denied"
 
-        time.sleep(max(1, int(poll_seconds)))
+        if not long_polled:
+            mtime = _state_file_mtime(state_path) if state_path else None
+            if mtime != last_mtime:
+                last_mtime = mtime
+                sleep_s = WAIT_POLL_MIN_SEC
+            else:
+                sleep_s = min(sleep_s * 1.6, max(WAIT_POLL_MIN_SEC, float(poll_seconds)))
+            time.sleep(sleep_s)
 
 
 # ---------------------------------------------------------------------
@@ -984,16 +1386,9 @@ def maybe_send_reminders(state: Dict[str, Any], save_state_fn: Callable[[Dict[st
     now = dt.datetime.now(dt.timezone.utc)
     changed = False
 
-    for token, rec in list((state.get("pending_approvals") or {}).items()):
-        created_at = (rec.get("created_at") or "").strip()
-        if not created_at:
-            continue
-
-        try:
-            created_dt = dt.datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-            if created_dt.tzinfo is None:
-                created_dt = created_dt.replace(tzinfo=dt.timezone.utc)
-        except Exception:
+    for token, rec in list((state.get("pending_approvals") or _EMPTY).items()):
+        created_dt = _pending_created_dt(rec)
+        if created_dt is None:
             continue
 
         hard_deadline = created_dt + dt.timedelta(minutes=int(ttl_min))
@@ -1009,7 +1404,7 @@ def maybe_send_reminders(state: Dict[str, Any], save_state_fn: Callable[[Dict[st
             continue
 
         # one reminder per token
-        last_rem = (state.get("telegram_last_reminder_at") or {}).get(token)
+        last_rem = (state.get("telegram_last_reminder_at") or _EMPTY).get(token)
         if last_rem:
             continue
 
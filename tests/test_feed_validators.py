@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+import tay_weather_bot as bot
+
+
+def _run_all_clear(monkeypatch, tmp_path, decision):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "state.json").write_text(json.dumps({"last_had_alert": True}), encoding="utf-8")
+
+    def fake_fetch(url, validators=None, **kwargs):
+        validators["etag"] = '"v2"'
+        validators["last_modified"] = "Fri, 16 Oct 2026 12:00:00 GMT"
+        return []
+
+    def fake_preview(state, save_fn, *args, **kwargs):
+        # The real helper saves state while recording the preview.
+        save_fn(state)
+
+    monkeypatch.setattr(bot, "TELEGRAM_ENABLE_GATE", True)
+    monkeypatch.setattr(bot, "resolve_more_info_url", lambda: "https://example.invalid/")
+    monkeypatch.setattr(bot, "fetch_feed_entries", fake_fetch)
+    monkeypatch.setattr(bot, "_init_google_services", lambda: (None, None, "", ""))
+    monkeypatch.setattr(bot, "load_rss_tree", lambda: (None, bot.ET.Element("channel")))
+    monkeypatch.setattr(bot, "choose_images_for_alert", lambda **kwargs: [])
+    monkeypatch.setattr(bot, "ingest_telegram_actions", lambda state, save_fn: save_fn(state))
+    monkeypatch.setattr(bot, "maybe_send_reminders", lambda state, save_fn: None)
+    monkeypatch.setattr(bot, "ensure_preview_sent", fake_preview)
+    monkeypatch.setattr(bot, "decision_for", lambda state, token: None)
+    monkeypatch.setattr(bot, "wait_for_decision_safe", lambda state, token: decision)
+    monkeypatch.setattr(bot, "safe_post_to_x", lambda *args, **kwargs: None)
+    monkeypatch.setattr(bot, "EFFECTIVE_ENABLE_X_POSTING", False)
+    monkeypatch.setattr(bot, "EFFECTIVE_ENABLE_FB_POSTING", False)
+
+    bot.main()
+    return json.loads((tmp_path / "state.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("decision", ["denied", "timeout"])
+def test_unapproved_all_clear_does_not_store_validators(monkeypatch, tmp_path, decision):
+    saved = _run_all_clear(monkeypatch, tmp_path, decision)
+
+    assert bot.ALERT_FEED_URL not in (saved.get("http_validators") or {})
+    assert saved["last_had_alert"] is True
+
+
+def test_approved_all_clear_stores_validators(monkeypatch, tmp_path):
+    saved = _run_all_clear(monkeypatch, tmp_path, "approved")
+
+    assert saved["http_validators"][bot.ALERT_FEED_URL]["etag"] == '"v2"'
+    assert saved["last_had_alert"] is False